@@ -13,7 +13,7 @@ from PIL import ImageFont, Image, ImageDraw
 from luma.core.render import canvas
 from luma.core.interface.serial import spi
 from luma.core import cmdline
-from lxml import objectify
+from lxml import etree
 from datetime import datetime
 from luma.core.image_composition import ImageComposition, ComposableImage
 
@@ -99,15 +99,15 @@ class LiveTime(object):
 	
 	# * Change this method to implement your own API *
 	def __init__(self, Data, Index):
-		self.ServiceNumber = "%s.%s" % (Index + 1, str(Data.LineRef)) if Args.ShowIndex else str(Data.LineRef)
-		self.Destination = str(Data.DestinationName)
-		self.SchArrival = str(Data.MonitoredCall.AimedArrivalTime).split("+")[0]
-		self.ExptArrival = str(getattr( Data.MonitoredCall, "ExpectedArrivalTime", "")).split("+")[0]
+		self.ServiceNumber = "%s.%s" % (Index + 1, Data["LineRef"]) if Args.ShowIndex else Data["LineRef"]
+		self.Destination = Data["DestinationName"]
+		self.SchArrival = Data["AimedArrivalTime"].split("+")[0]
+		self.ExptArrival = Data["ExpectedArrivalTime"].split("+")[0]
 		# The "Via" message, which lists where the service will go through, if unknown use generic message.
-		self.Via = str(getattr(Data, "Via", GenericVia))
+		self.Via = Data["Via"] or GenericVia
 		# The formated string containing the time of arrival, to be printed on the display screen.
 		self.DisplayTime = self.GetDisplayTime()
-		self.ID =  str(Data.FramedVehicleJourneyRef.DatedVehicleJourneyRef)
+		self.ID =  Data["ID"]
 	
 	#Returns the value to display the time on the board.
 	def GetDisplayTime(self):
@@ -125,6 +125,31 @@ class LiveTime(object):
 				return ' ' + datetime.strptime(self.SchArrival, '%Y-%m-%dT%H:%M:%S').strftime("%H:%M" if (Args.TimeFormat==24) else  "%I:%M")
 			return  ' %d min' % Diff
 
+	# The fields of each MonitoredVehicleJourney used to make a LiveTime object, and where to find them.
+	FIELDS = {"LineRef": "{*}LineRef", "DestinationName": "{*}DestinationName", "AimedArrivalTime": "{*}MonitoredCall/{*}AimedArrivalTime",
+		"ExpectedArrivalTime": "{*}MonitoredCall/{*}ExpectedArrivalTime", "ID": "{*}FramedVehicleJourneyRef/{*}DatedVehicleJourneyRef", "Via": "{*}Via"}
+
+	# Reads the services from a siri-sm response as it is parsed, returning the fields of each as a dictionary. Each service is thrown away once
+	# read so the whole response is never held in memory, and reading stops once 'limit' services have been found.
+	# The Reading Buses API sometimes reports the same bus multiple times, only the first is kept.
+	@staticmethod
+	def ParseServices(source, limit):
+		services = []
+		seen = set()
+		for event, journey in etree.iterparse(source, events=("end",), tag="{*}MonitoredVehicleJourney"):
+			service = {field: journey.findtext(path, "") for field, path in LiveTime.FIELDS.items()}
+			visit = journey.getparent()
+			journey.clear()
+			while visit.getprevious() is not None:
+				del visit.getparent()[0]
+			# If not already recorded and not in the excluded services list add it.
+			if service["ID"] not in seen and service["LineRef"] not in Args.ExcludeServices:
+				seen.add(service["ID"])
+				services.append(service)
+				if len(services) >= limit:
+					break
+		return services
+
 	# Returns true or false dependent upon if the last time an API data call was made was over the request limit; to prevent spamming the API feed.
 	@staticmethod
 	def TimePassed():
@@ -143,20 +168,10 @@ class LiveTime(object):
 
 		try:
 			with urlopen("https://jonathanfoot.com/Projects/DepartureBoard/Assets/demoFile.xml") as conn:
-				rawServices = objectify.fromstring(conn.read())
-			
-				# The Reading Buses API sometimes reports the same bus multiple times. To work around this we need to check if we have already found it.
-				for root in rawServices.ServiceDelivery.StopMonitoringDelivery.MonitoredStopVisit:
-					service = root.MonitoredVehicleJourney
-					exists = False
-					for current in services:
-						if current.ID == service.FramedVehicleJourneyRef.DatedVehicleJourneyRef:
-							exists = True
-							break
-					# If not already recorded and not in the excluded services list add it.
-					if exists == False and str(service.LineRef) not in Args.ExcludeServices:
-						# Convert the custom Reading Buses API object into a LiveTime object and add it to the list.
-						services.append(LiveTime(service, len(services)))
+				# The response is parsed as it is downloaded; only as many services as can be shown before the next refresh are needed, one for each card and at least one for each row.
+				for service in LiveTime.ParseServices(conn, max(3, Args.NumberOfCards + 1)):
+					# Convert the custom Reading Buses API object into a LiveTime object and add it to the list.
+					services.append(LiveTime(service, len(services)))
 			return services
 		except Exception as e:
 			print("GetData() ERROR")
@@ -8,12 +8,20 @@ import time
 import inspect,os
 import sys
 import json
+import threading
+import random
+import hashlib
+import zlib
+import socket
+import ssl
+import http.client
 import argparse
-from urllib.request import urlopen
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
 from PIL import ImageFont, Image, ImageDraw
 from luma.core.render import canvas
 from luma.core import cmdline
-from datetime import datetime
+from datetime import datetime, timedelta
 from luma.core.image_composition import ImageComposition, ComposableImage
 
 ###
@@ -44,10 +52,16 @@ parser = argparse.ArgumentParser(description='National Buses Live Departure Boar
 parser.add_argument("-t","--TimeFormat", help="Do you wish to use 24hr or 12hr time format; default is 24hr.", type=int,choices=[12,24],default=24)
 parser.add_argument("-v","--Speed", help="What speed do you want the text to scroll at on the display; default is 3, must be greater than 0.", type=check_positive,default=3)
 parser.add_argument("-d","--Delay", help="How long the display will pause before starting the next animation; default is 30, must be greater than 0.", type=check_positive,default=30)
-parser.add_argument("-r","--RecoveryTime", help="How long the display will wait before attempting to get new data again after previously failing; default is 100, must be greater than 0.", type=check_positive,default=100)
+parser.add_argument("-r","--RecoveryTime", help="How long, in seconds, the display will wait before attempting to get new data again after previously failing. This doubles after each failure in a row, up to the 'MaxRecoveryTime'; default is 10, must be greater than 0.", type=check_positive,default=10)
+parser.add_argument("--RefreshDeadline", help="The longest time, in seconds, one refresh of the data can take; including the main request and any look ups which follow it, such as for Via messages. Anything not retrieved in time is left out until the next refresh; default is 30.", type=check_positive,default=30)
+parser.add_argument("--StaleLimit", help="If new data can not be retrieved, how long, in seconds, the display will keep showing the last data it got; counting down the times from when each service was expected and leaving off any which have already left. After this nothing is shown until new data is retrieved; default is 600.", type=check_positive,default=600)
+parser.add_argument("--MaxRecoveryTime", help="The longest time, in seconds, the display will wait before attempting to get new data again after failing many times in a row; default is 600, must be greater than 0.", type=check_positive,default=600)
 parser.add_argument("-n","--NumberOfCards", help="The maximum number of cards you will see before forcing a new data retrieval, a limit is recommend to prevent cycling through data which may become out of data or going too far into scheduled buses; default is 9, must be greater than 0.", type=check_positive,default=9)
 parser.add_argument("-y","--Rotation", help="Defines which way up the screen is rendered; default is 0", type=int,default=0,choices=[0,2])
 parser.add_argument("-l","--RequestLimit", help="Defines the minium amount of time the display must wait before making a new data request; default is 75(seconds)", type=check_positive,default=75)
+parser.add_argument("--MaxRequestLimit", help="Defines the maximum amount of time the display will wait before making a new data request. The display requests new data more often the sooner the next service is due, down to the 'RequestLimit', and waits this long when there are no services at all; default is 900(seconds)", type=check_positive,default=900)
+parser.add_argument("--DailyHitLimit", help="The number of hits (API calls) a day your Transport API plan allows. The display spreads these out over the hours it is not in energy saving mode and stops looking up Via messages before they run out; default is 1000.", type=check_positive,default=1000)
+parser.add_argument("--FixedRequestLimit", dest='FixedRequestLimit', action='store_true', help="Always make a new data request every 'RequestLimit' seconds, instead of changing how often based upon how soon the next service is due.")
 parser.add_argument("-z","--StaticUpdateLimit", help="Defines the amount of time the display will wait before updating the expected arrival time (based upon it's last known predicted arrival time); default is  15(seconds), this should be lower than your 'RequestLimit'", type=check_positive,default=15)
 parser.add_argument("-e","--EnergySaverMode", help="To save screen from burn in and prolong it's life it is recommend to have energy saving mode enabled. 'off' is default, between the hours set the screen will turn off. 'dim' will turn the screen brightness down, but not completely off. 'none' will do nothing and leave the screen on; this is not recommend, you can change your active hours instead.", type=str,choices=["none","dim","off"],default="off")
 parser.add_argument("-i","--InactiveHours", help="The period of time for which the display will go into 'Energy Saving Mode' if turned on; default is '23:00-07:00'", type=check_time,default="23:00-07:00")
@@ -60,10 +74,13 @@ parser.add_argument("-f","--FixedLocations",type=check_positive, default=3, help
 parser.add_argument("-g","--ServiceName", choices=["1","2"], default="1", help="Depending on the region the buses service number maybe different to the bus service name. If this is the case you can switch between bus service nummber or name to suit your preference.")
 parser.add_argument("--ExtraLargeLineName", dest='LargeLineName', action='store_true', help="By default the service number/ name assumes it will be under 3 characters in length ie 0 - 999. Some regions may use words, such as 'Indigo' Service in Nottingham. Use this tag to expand the named region. When this is on you can not also have show index turned on.")
 parser.add_argument("--ShowOperator",  dest='ShowOperator', action='store_true', help="If at the start of the Via message you want to say both the operator of the service and the Via message use this to turn it on; by default it is off.")
+parser.add_argument("--ViaWorkers", type=check_positive, default=4, help="How many journeys are looked up from the API at the same time, for the Via message and the last stop used with '--Destination 2'. The services are shown straight away and each is filled in once it has been got; default is 4.")
 parser.add_argument("--ReducedAnimations", help="If you wish to stop the Via animation and cycle faster through the services use this tag to turn the animation off.", dest='ReducedAnimations', action='store_true')
 parser.add_argument("--UnfixNextToArrive",dest='FixToArrive', action='store_false', help="Keep the bus sonnest to next arrive at the very top of the display until it has left; by default true")
 parser.add_argument('--no-splashscreen', dest='SplashScreen', action='store_false',help="Do you wish to see the splash screen at start up; recommended and on by default.")
 parser.add_argument('--ShowIndex', dest='ShowIndex', action='store_true',help="Do you wish to see index position for each service due to arrive. This can not be turned on with 'ExtraLargeLineName'")
+parser.add_argument("--IgnoreNetwork", dest="IgnoreNetwork", action="store_true", help="Used to keep making requests even when the Pi does not appear to be connected to a network. By default no requests are made while there is no connection and new data is got as soon as it comes back.")
+parser.add_argument("--Proxy", default=None, help="The address of a Departure Board Proxy (ProxyPy3.py) on your network, such as 'http://192.168.1.10:8080'. Requests to the API are sent through it, so boards showing the same stop share them; by default the API is used directly.")
 parser.add_argument("--Display", default="ssd1322", choices=['ssd1322','pygame','capture','gifanim'], help="Used for development purposes, allows you to switch from a physical display to a virtual emulated one; default 'ssd1322'")
 parser.add_argument("--max-frames", default=60,dest='maxframes', type=check_positive, help="Used only when using gifanim emulator, sets how long the gif should be.")
 parser.add_argument("--no-console-output",dest='NoConsole', action='store_true', help="Used to stop the program outputting anything to console that isn't an error message, you might want to do this if your logging the program output into a file to record crashes.")
@@ -87,6 +104,7 @@ BasicFont = ImageFont.truetype("%s/resources/lower.ttf" % (os.path.dirname(os.pa
 SmallFont = ImageFont.truetype("%s/resources/lower.ttf" % (os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))),12)
 # To prevent unnecessary calls to the API we assume a service will always follow the same route throughout the day 
 # Once we have got the destination for that service and it's "Via" message we save it here to be looked up if needed again.
+# Both are keyed by the line, direction and operator of the service, see LiveTime.Journey.
 Vias = {"0":"Via London Bridge"}
 Dest = {"0":"Central London"}
 
@@ -98,6 +116,539 @@ if Args.LargeLineName and Args.ShowIndex:
 if Args.NextBus == 'yes':
 	print("Warning : Any region covered by the NextBus API has a limit of 100 API calls per day, which will not last you a full day of usage.")
 
+###
+## HTTP Client
+## Keeps connections to each API server open between requests, so a new request does not have to look up the server's address,
+## connect and redo the TLS handshake every time; on a Pi Zero the handshake alone costs more than reading the response.
+###
+# The result of a request made using the HTTPClient.
+class APIResponse():
+	def __init__(self, status, headers, body, unchanged=False, url=None, validator=None):
+		self.status = status
+		self.headers = headers
+		self.body = body
+		# True if the server returned exactly the same data as the last time this URL was requested.
+		self.unchanged = unchanged
+		# The ETag, Last-Modified date and hash of the response, only remembered for the URL once the data has been used, see HTTPClient.commit.
+		self.url = url
+		self.validator = validator
+
+# Limits how long one refresh of the data can take in total, including the main request and every look up which follows it.
+# It can also be cancelled, after which it acts as if it has run out of time.
+class Deadline():
+	def __init__(self, seconds):
+		self.expires = time.monotonic() + seconds
+		self.cancelled = False
+
+	def Cancel(self):
+		self.cancelled = True
+
+	# Returns how many seconds are left before the deadline.
+	def Remaining(self):
+		return 0 if self.cancelled else max(0, self.expires - time.monotonic())
+
+	def Expired(self):
+		return self.Remaining() <= 0
+
+# Raised when a request is stopped because its deadline has passed.
+class DeadlineExceeded(TimeoutError):
+	pass
+
+# A connection which connects using the addresses already looked up by the HTTPClient, instead of looking them up itself.
+class PooledHTTPConnection(http.client.HTTPConnection):
+	def __init__(self, host, port, client, timeout):
+		super().__init__(host, port, timeout=timeout)
+		self.client = client
+
+	def connect(self):
+		self.sock = self.client.connect(self.host, self.port, self.timeout)
+
+class PooledHTTPSConnection(http.client.HTTPSConnection):
+	def __init__(self, host, port, client, timeout, context):
+		super().__init__(host, port, timeout=timeout, context=context)
+		self.client = client
+		self.sslContext = context
+
+	def connect(self):
+		sock = self.client.connect(self.host, self.port, self.timeout)
+		self.sock = self.sslContext.wrap_socket(sock, server_hostname=self.host)
+
+class HTTPClient():
+	# How long to remember a server's address before looking it up again, in seconds.
+	DNS_TTL = 300
+	# How long to wait on a server before giving up on a request, in seconds.
+	TIMEOUT = 20
+	# How many URLs to remember the last response of, for making conditional requests.
+	MAX_VALIDATORS = 64
+	# How much of a compressed response to read and decompress at a time, in bytes.
+	CHUNK_SIZE = 16384
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.context = ssl.create_default_context()
+		# Connections not currently being used, ready to be used again; keyed by (scheme, host, port).
+		self.idle = {}
+		# Server addresses already looked up, as a list of (family, address), and when they expire; keyed by (host, port).
+		self.addresses = {}
+		# The ETag, Last-Modified date and hash of the last response used from each URL; keyed by URL.
+		self.validators = {}
+		# The number of bytes received from each server and how many that was once decompressed; keyed by host.
+		self.traffic = {}
+		self.requests = 0
+		self.reused = 0
+		self.opened = 0
+
+	# Makes a GET request, returning an APIResponse. Raises an exception if the request fails or the server returns an error.
+	# If a deadline is given the request is stopped, raising DeadlineExceeded, if it has not finished by then.
+	# If conditional, the server is asked to only send the data if it has changed, and the response is marked as unchanged
+	# if the server says it hasn't (304 Not Modified) or it sends exactly the same data as last time anyway. What is compared against is
+	# the last response passed to commit.
+	def get(self, url, headers={}, timeout=None, conditional=False, deadline=None):
+		timeout = timeout or HTTPClient.TIMEOUT
+		# Send the request through the proxy, if using one; the proxy passes it on to the API.
+		if Args.Proxy != None:
+			url = "%s/%s" % (Args.Proxy.rstrip("/"), url)
+		if deadline != None:
+			if deadline.Expired():
+				raise DeadlineExceeded("No time left to request %s" % urlsplit(url).hostname)
+			timeout = min(timeout, deadline.Remaining())
+		headers = dict(headers)
+		headers.setdefault("Accept-Encoding", "gzip, deflate")
+		with self.lock:
+			validator = self.validators.get(url)
+		if conditional and validator != None:
+			if validator[0] != None:
+				headers["If-None-Match"] = validator[0]
+			if validator[1] != None:
+				headers["If-Modified-Since"] = validator[1]
+		parts = urlsplit(url)
+		key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+		path = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+
+		conn, reused = self.take(key, timeout)
+		while True:
+			try:
+				conn.request("GET", path, headers=headers)
+				response = conn.getresponse()
+				body, received = self.read(response, conn, deadline)
+				break
+			except DeadlineExceeded:
+				conn.close()
+				raise
+			except (http.client.HTTPException, OSError) as e:
+				conn.close()
+				# A request cut short by its deadline times out, or fails if the deadline was cancelled.
+				if deadline != None and deadline.Expired():
+					raise DeadlineExceeded("Ran out of time requesting %s" % parts.hostname)
+				# The server may have closed a connection that was left open, if so try again once on a brand new connection.
+				# A server which is too slow to answer would just be as slow again, so that is not retried.
+				if not reused or isinstance(e, socket.timeout):
+					raise
+				if deadline != None:
+					if deadline.Expired():
+						raise DeadlineExceeded("Ran out of time requesting %s" % parts.hostname)
+					timeout = min(timeout, deadline.Remaining())
+				conn, reused = self.open(key, timeout), False
+
+		with self.lock:
+			self.requests += 1
+			self.reused += 1 if reused else 0
+			traffic = self.traffic.setdefault(parts.hostname, [0, 0])
+			traffic[0] += received
+			traffic[1] += len(body)
+		if response.will_close:
+			conn.close()
+		else:
+			self.release(key, conn)
+
+		if response.status >= 400:
+			raise http.client.HTTPException("HTTP Error %d: %s" % (response.status, response.reason))
+		# Redirects are not followed; the body is not the data asked for, so it must not be used or remembered as the last response.
+		if response.status >= 300 and response.status != 304:
+			raise http.client.HTTPException("HTTP Redirect %d: %s to %s, which is not followed" % (response.status, response.reason, response.getheader("Location")))
+		if response.status == 304:
+			return APIResponse(response.status, response.headers, body, conditional and validator != None)
+
+		digest = hashlib.sha1(body).digest()
+		return APIResponse(response.status, response.headers, body, conditional and validator != None and validator[2] == digest,
+			url, (response.getheader("ETag"), response.getheader("Last-Modified"), digest))
+
+	# Remembers a response as the last one from its URL, for making conditional requests. Only called once its data has been read
+	# successfully; otherwise the same broken data sent again would be taken as unchanged, and never read again.
+	def commit(self, response):
+		if response.validator == None:
+			return
+		with self.lock:
+			self.validators.pop(response.url, None)
+			self.validators[response.url] = response.validator
+			# Forget the oldest URL once too many are remembered.
+			if len(self.validators) > HTTPClient.MAX_VALIDATORS:
+				self.validators.pop(next(iter(self.validators)))
+
+	# Reads the body of a response, decompressing it as it arrives if the server compressed it. Also returns the number of bytes actually received.
+	# The body is read a piece at a time so the deadline, if there is one, can be checked between each piece.
+	def read(self, response, conn, deadline):
+		encoding = (response.getheader("Content-Encoding") or "").strip().lower()
+		decompressor = None
+		chunks = []
+		received = 0
+		while True:
+			if deadline != None:
+				if deadline.Expired():
+					raise DeadlineExceeded("Ran out of time reading the response from %s" % conn.host)
+				if conn.sock != None:
+					conn.sock.settimeout(min(conn.timeout, deadline.Remaining()))
+			# Unlike read1, read marks the response as finished once all of it has been read, without which the connection can not be reused.
+			chunk = response.read(HTTPClient.CHUNK_SIZE)
+			if not chunk:
+				break
+			received += len(chunk)
+			if encoding not in ("gzip", "deflate"):
+				chunks.append(chunk)
+				continue
+			if decompressor == None:
+				# Some servers send raw deflate data without the zlib header it is meant to have.
+				if encoding == "gzip":
+					decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+				else:
+					decompressor = zlib.decompressobj(zlib.MAX_WBITS if chunk[0] & 0x0F == 8 else -zlib.MAX_WBITS)
+			chunks.append(decompressor.decompress(chunk))
+		if decompressor != None:
+			chunks.append(decompressor.flush())
+		# A response with no body, such as 304 Not Modified, is not marked as finished by reading it; so it is closed here to be sure.
+		response.close()
+		return b"".join(chunks), received
+
+	# Returns an idle connection to the server if there is one, otherwise opens a new one. Also returns if the connection is being reused.
+	def take(self, key, timeout):
+		with self.lock:
+			if len(self.idle.get(key, [])) > 0:
+				conn = self.idle[key].pop()
+				conn.timeout = timeout
+				if conn.sock != None:
+					conn.sock.settimeout(timeout)
+				return conn, True
+		return self.open(key, timeout), False
+
+	# Puts a connection back, ready for the next request to the same server.
+	def release(self, key, conn):
+		with self.lock:
+			self.idle.setdefault(key, []).append(conn)
+
+	def open(self, key, timeout):
+		scheme, host, port = key
+		with self.lock:
+			self.opened += 1
+		if scheme == "https":
+			return PooledHTTPSConnection(host, port, self, timeout, self.context)
+		return PooledHTTPConnection(host, port, self, timeout)
+
+	# Opens a socket to a server, trying each of its addresses in turn until one connects, all within the timeout. If an address can not
+	# be connected to, the addresses are looked up again for the next connection as the server may have moved.
+	def connect(self, host, port, timeout):
+		end = time.monotonic() + timeout
+		error = None
+		for family, address in self.resolve(host, port, timeout):
+			if end - time.monotonic() <= 0:
+				raise socket.timeout("Timed out connecting to %s" % host)
+			sock = socket.socket(family, socket.SOCK_STREAM)
+			try:
+				sock.settimeout(end - time.monotonic())
+				sock.connect(address)
+				return sock
+			except OSError as e:
+				sock.close()
+				error = e
+				with self.lock:
+					self.addresses.pop((host, port), None)
+		raise error
+
+	# Looks up the addresses of a server, remembering them for a short while so they do not need to be looked up on every new connection.
+	def resolve(self, host, port, timeout):
+		with self.lock:
+			if (host, port) in self.addresses and self.addresses[(host, port)][1] > time.monotonic():
+				return self.addresses[(host, port)][0]
+		addresses = self.lookup(host, port, timeout)
+		with self.lock:
+			self.addresses[(host, port)] = (addresses, time.monotonic() + HTTPClient.DNS_TTL)
+		return addresses
+
+	# The system can take a long time to look up an address, and can not be told how long to wait; so it is looked up on another thread
+	# which is only waited on for the timeout, keeping the request within its deadline.
+	def lookup(self, host, port, timeout):
+		result = []
+		def getaddrinfo():
+			try:
+				result.append(socket.getaddrinfo(host, port, type=socket.SOCK_STREAM))
+			except Exception as e:
+				result.append(e)
+		thread = threading.Thread(target=getaddrinfo, name="lookup", daemon=True)
+		thread.start()
+		thread.join(timeout)
+		if len(result) == 0:
+			raise socket.timeout("Timed out looking up %s" % host)
+		if isinstance(result[0], Exception):
+			raise result[0]
+		addresses = list(dict.fromkeys((family, address) for family, _, _, _, address in result[0]))
+		if len(addresses) == 0:
+			raise socket.gaierror("No addresses found for %s" % host)
+		return addresses
+
+	# Closes the connections not being used and forgets the server addresses looked up, used when the network connection has changed
+	# as they may no longer work.
+	def reset(self):
+		with self.lock:
+			for conns in self.idle.values():
+				for conn in conns:
+					conn.close()
+			self.idle = {}
+			self.addresses = {}
+
+	# Returns a summary of how many requests have been made, how many were able to reuse an open connection and how much data was received from each server.
+	def stats(self):
+		with self.lock:
+			summary = "HTTP requests: %d, reused connections: %d (%d%%), new connections: %d" % (self.requests, self.reused, 100 * self.reused / max(1, self.requests), self.opened)
+			for host, (received, decoded) in self.traffic.items():
+				summary += ", %s: %.1fkB received (%.1fkB uncompressed, %d%% saved)" % (host, received / 1024, decoded / 1024, 100 - 100 * received / max(1, decoded))
+			return summary
+
+Client = HTTPClient()
+
+
+###
+## TransportAPI Quota
+## The Transport API only allows so many hits a day, once they have been used the display can not get any new data until the next day.
+## This keeps count of the hits used on each endpoint, spreads the hits left over the rest of the day and stops looking up Via messages before they run out.
+###
+class QuotaBudget():
+	# Where the hits used today are saved, so they are not forgotten if the program restarts.
+	FILE = "%s/cache/quota.json" % (os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe()))))
+	# How many hits can be used before they are saved, so the SD card is not written to on every request. At most this many hits are forgotten
+	# if the program restarts, the first hit of each day is always saved.
+	SAVE_EVERY = 10
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.date = str(datetime.now().date())
+		# The number of hits used today; keyed by endpoint, 'live' for departures and 'journey' for Via message lookups.
+		self.hits = {"live": 0, "journey": 0}
+		# The day of the hits last saved, and how many hits have been used since then.
+		self.savedDate = None
+		self.unsaved = 0
+		try:
+			with open(QuotaBudget.FILE) as f:
+				saved = json.load(f)
+			if saved['date'] == self.date:
+				self.hits.update(saved['hits'])
+				self.savedDate = saved['date']
+		except Exception:
+			pass
+
+	# Records a hit being used on an endpoint.
+	def Spend(self, endpoint):
+		with self.lock:
+			self.NewDay()
+			self.hits[endpoint] = self.hits.get(endpoint, 0) + 1
+			self.unsaved += 1
+			if self.savedDate != self.date or self.unsaved >= QuotaBudget.SAVE_EVERY:
+				self.Save()
+
+	# Saves the hits used today, so they are not forgotten if the program restarts.
+	def Save(self):
+		try:
+			os.makedirs(os.path.dirname(QuotaBudget.FILE), exist_ok=True)
+			with open(QuotaBudget.FILE, "w") as f:
+				json.dump({"date": self.date, "hits": self.hits}, f)
+			self.savedDate = self.date
+			self.unsaved = 0
+		except Exception as e:
+			print("QuotaBudget.Save() ERROR")
+			print(str(e))
+
+	# The hit count is reset by the Transport API at the start of every day.
+	def NewDay(self):
+		if self.date != str(datetime.now().date()):
+			self.date = str(datetime.now().date())
+			self.hits = {"live": 0, "journey": 0}
+
+	def Remaining(self):
+		with self.lock:
+			self.NewDay()
+			return Args.DailyHitLimit - sum(self.hits.values())
+
+	# Returns how many seconds are left today outside of the energy saving hours, if energy saving mode is being used.
+	def ActiveSecondsLeft(self):
+		now = datetime.now()
+		midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+		seconds = (midnight - now).total_seconds()
+		if Args.EnergySaverMode != "none":
+			start = datetime.combine(now.date(), Args.InactiveHours[0])
+			end = datetime.combine(now.date(), Args.InactiveHours[1])
+			inactive = [(start, end)] if start < end else [(datetime.combine(now.date(), datetime.min.time()), end), (start, midnight)]
+			for begin, finish in inactive:
+				seconds -= max(0, (finish - max(begin, now)).total_seconds())
+		return max(seconds, 1)
+
+	# Returns true or false dependent upon if there are enough hits left to use one on the endpoint.
+	# Via messages are only looked up while there are enough hits left to keep getting departures every 'RequestLimit' for the rest of the day.
+	def Allow(self, endpoint):
+		remaining = self.Remaining()
+		if endpoint == "journey":
+			return remaining > self.ActiveSecondsLeft() / Args.RequestLimit
+		return remaining > 0
+
+	# Returns the shortest time between getting departures, in seconds, that will make the hits left last for the rest of the day.
+	# Once all of the hits have been used, waits until they are reset at midnight.
+	def PollInterval(self):
+		remaining = self.Remaining()
+		if remaining <= 0:
+			return (datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time()) - datetime.now()).total_seconds()
+		return self.ActiveSecondsLeft() / remaining
+
+	# Returns a summary of the hits used today on each endpoint and how many are left.
+	def stats(self):
+		with self.lock:
+			return "TransportAPI hits today: %s, %d left" % (", ".join("%s %d" % (endpoint, hits) for endpoint, hits in self.hits.items()), Args.DailyHitLimit - sum(self.hits.values()))
+
+Quota = QuotaBudget()
+
+
+###
+## Circuit Breaker
+## Keeps track of whether an API endpoint is working. After a failure no more requests are made to it for a while, this wait doubles
+## after each failure in a row up to the 'MaxRecoveryTime', with a random amount taken off so many displays do not all retry at the same time.
+## The first request to succeed resets it, so an endpoint which has recovered is used again straight away.
+###
+class CircuitBreaker():
+	def __init__(self, name):
+		self.name = name
+		self.lock = threading.Lock()
+		# The number of failures in a row.
+		self.failures = 0
+		# No requests should be made to the endpoint before this time.
+		self.RetryAt = datetime.now()
+
+	# Returns true or false dependent upon if a request can be made to the endpoint.
+	def Allow(self):
+		with self.lock:
+			return datetime.now() >= self.RetryAt
+
+	def Success(self):
+		with self.lock:
+			if self.failures > 0:
+				print_safe("%s recovered after %d failures" % (self.name, self.failures))
+			self.failures = 0
+
+	# Lets a request be made straight away, used when the cause of the failures has been fixed.
+	def Reset(self):
+		with self.lock:
+			self.failures = 0
+			self.RetryAt = datetime.now()
+
+	# Records a failure, returning the time at which a request can next be made to the endpoint.
+	def Failure(self):
+		with self.lock:
+			self.failures += 1
+			delay = min(Args.MaxRecoveryTime, Args.RecoveryTime * 2 ** min(self.failures - 1, 16))
+			delay = random.uniform(delay / 2, delay)
+			self.RetryAt = datetime.now() + timedelta(seconds=delay)
+			print_safe("%s failed %d time(s) in a row, waiting %ds before trying again" % (self.name, self.failures, delay))
+			return self.RetryAt
+
+FeedBreaker = CircuitBreaker("live.json")
+JourneyBreaker = CircuitBreaker("journey")
+
+
+###
+## Network Monitor
+## Watches whether the Pi is connected to a network, by checking it has a default route through an interface which is plugged in or
+## connected to Wi-Fi. While it is not no requests are made, as they could only fail after waiting to connect; once the connection comes
+## back new data is got straight away, instead of waiting out the time picked for the next request or the back off after the failures.
+###
+class NetworkMonitor():
+	# How often to check the connection, in seconds.
+	INTERVAL = 1
+	ROUTES = "/proc/net/route"
+	IPV6_ROUTES = "/proc/net/ipv6_route"
+	# Route flags, see linux/route.h.
+	RTF_UP = 0x0001
+	RTF_REJECT = 0x0200
+
+	def __init__(self, breakers):
+		self.breakers = breakers
+		self.Online = True
+		# Set when the connection comes back, until the board has started getting new data.
+		self.Refresh = False
+
+	# Starts checking the connection in the background.
+	def start(self):
+		self.Online = NetworkMonitor.Connected()
+		threading.Thread(target=self.run, daemon=True).start()
+
+	def run(self):
+		while True:
+			time.sleep(NetworkMonitor.INTERVAL)
+			online = NetworkMonitor.Connected()
+			if online == self.Online:
+				continue
+			self.Online = online
+			if online:
+				print_safe("Network connection restored %s, getting new data" % datetime.now().time())
+				self.Reconnected()
+			else:
+				print_safe("Network connection lost %s, showing the last data retrieved until it comes back" % datetime.now().time())
+				# Stop any request in progress, it can not finish now.
+				Fetcher.cancel()
+
+	# Forgets the failures made while there was no connection and gets new data now.
+	def Reconnected(self):
+		for breaker in self.breakers:
+			breaker.Reset()
+		Client.reset()
+		LiveTime.NextUpdate = datetime.now()
+		self.Refresh = True
+
+	# Returns true or false dependent upon if there is a default route which is up, through an interface which has a carrier.
+	# If the routes can not be read, such as when not running on Linux, the connection is assumed to be working.
+	@staticmethod
+	def Connected():
+		try:
+			with open(NetworkMonitor.ROUTES) as routes:
+				next(routes)
+				for route in routes:
+					# Iface, Destination, Gateway, Flags, RefCnt, Use, Metric, Mask...
+					fields = route.split()
+					if fields[1] == "00000000" and fields[7] == "00000000" and int(fields[3], 16) & NetworkMonitor.RTF_UP and NetworkMonitor.Carrier(fields[0]):
+						return True
+		except OSError:
+			return True
+		try:
+			with open(NetworkMonitor.IPV6_ROUTES) as routes:
+				for route in routes:
+					# Destination, Prefix length, Source, Source prefix length, Next hop, Metric, RefCnt, Use, Flags, Iface.
+					fields = route.split()
+					flags = int(fields[8], 16)
+					if fields[1] == "00" and fields[9] != "lo" and flags & NetworkMonitor.RTF_UP and not flags & NetworkMonitor.RTF_REJECT and NetworkMonitor.Carrier(fields[9]):
+						return True
+		except OSError:
+			pass
+		return False
+
+	# Returns true or false dependent upon if the interface is plugged in or connected to Wi-Fi. Interfaces which do not report it, such
+	# as VPNs, are assumed to be connected; the kernel refuses to report it for an interface which is down.
+	@staticmethod
+	def Carrier(interface):
+		try:
+			with open("/sys/class/net/%s/carrier" % interface) as carrier:
+				return carrier.read().strip() == "1"
+		except FileNotFoundError:
+			return True
+		except OSError:
+			return False
+
+Network = NetworkMonitor([FeedBreaker, JourneyBreaker])
+
+
 ###
 # Below contains the class which is used to reperesent one instance of a service record. It is also responsible for getting the information from the Transport API.
 ###
@@ -120,68 +671,160 @@ class LiveTimeStud():
 class LiveTime(object):
 	# The last time an API call was made to get new data.
 	LastUpdate = datetime.now()
+	# The time at which the next API call should be made.
+	NextUpdate = datetime.now()
+	# How soon the next service must be due, in seconds, before polling as often as the RequestLimit allows.
+	SOON = 5 * 60
+	# The last list of services successfully retrieved, reused if the API returns the same data again.
+	LastServices = None
+	# The last time new data was successfully retrieved from the API.
+	LastGoodUpdate = None
+	# The deadline for the refresh in progress, which every request made as part of it must finish by.
+	CurrentDeadline = None
+	# How long after a service was expected, in seconds, before it is left off when showing old data.
+	DEPARTED = 60
+	# Looks up the journeys in the background, at most 'ViaWorkers' at a time.
+	JourneyPool = ThreadPoolExecutor(max_workers=Args.ViaWorkers, thread_name_prefix="journey")
+	# The journeys being looked up.
+	JourneysPending = set()
+	JourneyLock = threading.Lock()
+
+	# Only these are stored for each service, so the many services made on each refresh are kept small.
+	__slots__ = ("ID", "Index", "Line", "Operator", "ServiceNumber", "Direction", "SchArrival", "ExptArrival", "ExptClock", "Journey", "DisplayTime", "LastStaticUpdate")
 
 	# * Change this method to implement your own API *
 	def __init__(self, Data, Index):
 		self.ID =  str(Data['id'])
+		self.Index = Index
+		self.Line = str(Data['line'])
 		self.Operator = str(Data['operator_name'])
-		self.ServiceNumber = self.GetServiceNumber(Data, Index)
-		self.Destination = str(Data['direction'])
-		self.SchArrival = str(Data['aimed_departure_time'])
-		self.ExptArrival = str(Data['best_departure_estimate'])
-		# The "Via" message, which lists where the service will go through, if unknown use generic message.
-		self.Via = self.GetComplexVia(str(Data['line_name']) )
-		# The formated string containing the time of arrival, to be printed on the display screen.
-		self.DisplayTime = self.GetDisplayTime()
+		self.Direction = str(Data['direction'])
+		# When the service is scheduled and predicted to depart, in seconds since the epoch.
+		date = Data.get('date') or str(datetime.now().date())
+		self.SchArrival = LiveTime.ParseTime(date, str(Data['aimed_departure_time']))
+		self.ExptArrival = LiveTime.ParseTime(Data.get('expected_departure_date') or date, str(Data['best_departure_estimate']))
+		# Services on the same line, going the same way and run by the same operator share the same Via message and last stop.
+		self.Journey = (str(Data['line_name']), self.Direction, self.Operator)
+		# What is shown on the card is only worked out once the card is about to be shown, see Materialise.
+		self.DisplayTime = None
+
+	# Works out what is shown on the card for the service, the first time its card is about to be shown. Services the board never gets
+	# round to showing before the next refresh are never worked out.
+	def Materialise(self):
+		if self.DisplayTime == None:
+			self.ServiceNumber = self.GetServiceNumber()
+			self.ExptClock = LiveTime.FormatClock(self.ExptArrival)
+			# The formated string containing the time of arrival, to be printed on the display screen.
+			self.DisplayTime = self.GetDisplayTime()
+		return self
+
+	# Works out the time to display again, if the service has already been shown.
+	def RefreshDisplayTime(self):
+		if self.DisplayTime != None:
+			self.DisplayTime = self.GetDisplayTime()
+
+	# The "Via" message, which lists where the service will go through. Until the journey has been looked up in the background, see WarmJourneys,
+	# only the operator is shown if wanted.
+	@property
+	def Via(self):
+		Via = LiveTime.GetOperatorVia(self.Operator)
+		return Vias.get(self.Journey, Via + "." if Via != "" else "")
+
+	@property
+	def Destination(self):
+		if Args.Destination == "2":
+			return Dest.get(self.Journey, self.Direction)
+		return self.Direction
 
 	#Returns the value to display the time on the board.
 	def GetDisplayTime(self):
 		# Last time the display screen was updated to reflect the new time of arrival.
-		self.LastStaticUpdate = datetime.now()
+		self.LastStaticUpdate = time.time()
 		
-		Arrival = datetime.strptime(str(datetime.now().date()) + " "  + self.ExptArrival, '%Y-%m-%d %H:%M')
 		# The difference between the time now and when it is predicted to arrive.	
-		Diff =  (Arrival - datetime.now()).total_seconds() / 60
+		Diff =  (self.ExptArrival - self.LastStaticUpdate) / 60
 		if Diff <= 2:
 			return ' Due'
 		if Diff >=15 :
-			return ' ' + Arrival.time().strftime("%H:%M" if (Args.TimeFormat==24) else  "%I:%M")
+			return ' ' + self.ExptClock
 		return  ' %d min' % Diff
 
-	def GetServiceNumber(self, Data, Index):
+	# Converts a time given by the API, a date such as "2024-01-01" and a local time of day such as "10:05", into seconds since the epoch. Done once
+	# when the service is made, so working out how long is left is only a subtraction.
+	@staticmethod
+	def ParseTime(date, clock):
+		return datetime.strptime(date + " " + clock, '%Y-%m-%d %H:%M').timestamp()
+
+	# Returns the local time of day, as shown on the display, of a time in seconds since the epoch.
+	@staticmethod
+	def FormatClock(seconds):
+		return time.strftime("%H:%M" if (Args.TimeFormat==24) else  "%I:%M", time.localtime(seconds))
+
+	def GetServiceNumber(self):
 		if Args.ServiceName == "1":
-			return "%s.%s" % (Index + 1,str(Data['line'])) if Args.ShowIndex else str(Data['line']) 
+			return "%s.%s" % (self.Index + 1,self.Line) if Args.ShowIndex else self.Line
 		elif Args.ServiceName == "2":
-			return "%s.%s" % (Index + 1,str(Data['line_name'])) if Args.ShowIndex else str(Data['line_name']) 
+			return "%s.%s" % (self.Index + 1,self.Journey[0]) if Args.ShowIndex else self.Journey[0]
 
 
-	# The "Via" message is not given by the API, this method generates the Via message and returns it.
-	def GetComplexVia(self, Service):
-		Via = ""
+	# Returns the part of the Via message naming the operator, if it is wanted.
+	@staticmethod
+	def GetOperatorVia(Operator):
+		if Args.ShowOperator or Args.ViaMessageMode == "operator":
+			return "This is a " + Operator + " Service"
+		return ""
 
+	# Returns true or false dependent upon if the journeys need to be looked up at all; they are not when the Via message only names the
+	# operator, or is not shown, and the last stop is not used as the destination.
+	@staticmethod
+	def JourneyNeeded():
+		return Args.Destination == "2" or not (Args.ReducedAnimations or Args.ViaMessageMode == "operator")
 
+	# Starts looking up the journeys of the services given which are not already known, in the background so the services can be shown
+	# straight away. Each journey is only looked up once, however many services share it, and up to 'ViaWorkers' are looked up at a time.
+	@staticmethod
+	def WarmJourneys(services):
+		if not LiveTime.JourneyNeeded():
+			return
+		deadline = Deadline(Args.RefreshDeadline)
+		journeys = {}
+		with LiveTime.JourneyLock:
+			for service in services:
+				if service.Journey not in Vias and service.Journey not in LiveTime.JourneysPending and service.Journey not in journeys:
+					journeys[service.Journey] = service.ID
+			LiveTime.JourneysPending.update(journeys)
+		for journey, url in journeys.items():
+			LiveTime.JourneyPool.submit(LiveTime.WarmJourney, journey, url, deadline)
+
+	@staticmethod
+	def WarmJourney(Journey, url, deadline):
+		try:
+			LiveTime.GetComplexVia(Journey, url, deadline)
+		finally:
+			with LiveTime.JourneyLock:
+				LiveTime.JourneysPending.discard(Journey)
+
+	# The "Via" message is not given by the API, this method looks up the journey at url and generates the Via message and last stop from it.
+	@staticmethod
+	def GetComplexVia(Journey, url, deadline):
+		Via = LiveTime.GetOperatorVia(Journey[2])
+
+		# Don't look it up if the hits left are needed for getting departures, the API has been failing or there is no time left;
+		# it will be looked up again next time.
+		if not Quota.Allow("journey") or not JourneyBreaker.Allow() or deadline.Expired():
+			return
 
-		if Args.ShowOperator or Args.ViaMessageMode == "operator":
-			Via = "This is a " + self.Operator + " Service"
-		
-		#If the data has already been retrieved don't make another unended request.
-		if Service in Vias:
-			if Args.Destination == "2":
-				self.Destination = Dest[Service]
-			return Vias[Service]
-		
-		#Else this is the first time finding this service so look it up.
 		ViasTemp = []
 		try:
-			tempLocs = json.loads(urlopen(self.ID).read())
+			Quota.Spend("journey")
+			tempLocs = json.loads(Client.get(url, deadline=deadline).body)
+			JourneyBreaker.Success()
 
-			if Args.Destination == "2":
-				Dest[Service] = tempLocs['stops'][-1]['stop_name']
-				self.Destination = Dest[Service]
+			Dest[Journey] = tempLocs['stops'][-1]['stop_name']
 		
 			if Args.ReducedAnimations or Args.ViaMessageMode == "operator":
-				Vias[Service] = Via + "."			         
-				return Vias[Service]
+				Vias[Journey] = Via + "."			         
+				return
 
 			Via += " Via: "
 			for loc in tempLocs['stops']:
@@ -209,45 +852,192 @@ class LiveTime(object):
 						z += 1
 
 
-			Vias[Service] = Via[:-2] + "."			         
-			return Vias[Service]
+			Vias[Journey] = Via[:-2] + "."			         
+		except DeadlineExceeded:
+			return
 		except Exception as e:
 			print("GetComplexVia(service) ERROR")
 			print(str(e))
-		Vias[Service] = Via + "."
-		Dest[Service] = self.Destination
-		return Vias[Service]
+			# Don't remember it, so it is looked up again once the API is working.
+			JourneyBreaker.Failure()
 
-	# Returns true or false dependent upon if the last time an API data call was made was over the request limit; to prevent spamming the API feed.
+	# Returns true or false dependent upon if the time picked for the next API data call has been reached; to prevent spamming the API feed.
 	@staticmethod
 	def TimePassed():
-		return (datetime.now() - LiveTime.LastUpdate).total_seconds() > Args.RequestLimit
+		return datetime.now() >= LiveTime.NextUpdate
+
+	# Picks when the next API call should be made based upon how soon the next service is due. Polls as often as the RequestLimit allows when a service
+	# is about to arrive, less often the further away the next service is and only every MaxRequestLimit when there are no services at all.
+	@staticmethod
+	def ScheduleNextUpdate(services):
+		interval = Args.RequestLimit
+		if not Args.FixedRequestLimit:
+			due = [seconds for seconds in (service.SecondsUntilArrival() for service in services) if seconds != None]
+			if len(due) == 0:
+				interval = Args.MaxRequestLimit
+			elif min(due) > LiveTime.SOON:
+				interval = min(due) / 3
+		LiveTime.NextUpdate = LiveTime.LastUpdate + timedelta(seconds=max(Args.RequestLimit, min(interval, Args.MaxRequestLimit), Quota.PollInterval()))
+
+	# Returns how many seconds until the service is predicted to arrive.
+	def SecondsUntilArrival(self):
+		return self.ExptArrival - time.time()
 
 	# Return true or false dependent upon if the last time the display was updated was over the static update limit. This prevents updating the display to frequently to increase performance.
 	def TimePassedStatic(self):
-		return ("min" in self.DisplayTime) and (datetime.now() - self.LastStaticUpdate).total_seconds() > Args.StaticUpdateLimit 
+		return ("min" in self.DisplayTime) and time.time() - self.LastStaticUpdate > Args.StaticUpdateLimit 
 
 
+	# Updates the display times of the last services retrieved and returns them, used when the API returns the same data as last time.
+	@staticmethod
+	def RefreshLastServices():
+		for service in LiveTime.LastServices:
+			service.RefreshDisplayTime()
+		LiveTime.WarmJourneys(LiveTime.LastServices[:ServiceList.AHEAD])
+		LiveTime.ScheduleNextUpdate(LiveTime.LastServices)
+		return LiveTime.LastServices
+
+	# Used when new data can not be retrieved, keeps showing the last services retrieved with their times worked out again from when they were expected,
+	# leaving off any which have already left. Once the data is older than the 'StaleLimit' nothing is shown instead.
+	@staticmethod
+	def StaleServices():
+		if LiveTime.LastServices == None or (datetime.now() - LiveTime.LastGoodUpdate).total_seconds() > Args.StaleLimit:
+			return []
+		services = [service for service in LiveTime.LastServices if service.SecondsUntilArrival() == None or service.SecondsUntilArrival() > -LiveTime.DEPARTED]
+		for service in services:
+			service.RefreshDisplayTime()
+		print_safe("Unable to get new data, showing the data retrieved at %s" % LiveTime.LastGoodUpdate.time())
+		return services
+
 	# Calls the API and gets the data from it, returning a list of LiveTime objects to be used in the program.
 	# * Change this method to implement your own API *
 	@staticmethod
-	def GetData():
+	def GetData(deadline):
 		LiveTime.LastUpdate = datetime.now()
+		# Every request made as part of this refresh must finish by the deadline, given by the DataFetcher so it can stop it early.
+		LiveTime.CurrentDeadline = deadline
+		# If the request fails try again as soon as the RequestLimit allows.
+		LiveTime.NextUpdate = LiveTime.LastUpdate + timedelta(seconds=max(Args.RequestLimit, Quota.PollInterval()))
 		services = []
+
+		# Don't make a request while there is no network connection, new data is got as soon as it comes back.
+		if not Network.Online:
+			return LiveTime.StaleServices()
+
+		# Don't make a request if the API has been failing, until it is time to try it again.
+		if not FeedBreaker.Allow():
+			LiveTime.NextUpdate = max(LiveTime.NextUpdate, FeedBreaker.RetryAt)
+			return LiveTime.StaleServices()
 		
+		# If all of today's hits have been used, keep showing the last services retrieved until they are reset, leaving off any which have left.
+		if not Quota.Allow("live"):
+			print_safe("No Transport API hits left today - %s" % Quota.stats())
+			return LiveTime.StaleServices()
+
 		try:
-			with urlopen("https://transportapi.com/v3/uk/bus/stop/%s/live.json?app_id=%s&app_key=%s&group=no&limit=%s&nextbuses=%s" %  (Args.StopID, Args.APIID, Args.APIKey, max(3,Args.NumberOfCards),Args.NextBus)) as conn:
-				tempServices = json.loads(conn.read())
-				for service in tempServices['departures']['all']:
-					# If not in excluded services list, convert custom API object to LiveTime object and add to list.
-					if str(service['line']) not in Args.ExcludeServices:
-						services.append(LiveTime(service, len(services)))
-				return services
+			Quota.Spend("live")
+			response = Client.get("https://transportapi.com/v3/uk/bus/stop/%s/live.json?app_id=%s&app_key=%s&group=no&limit=%s&nextbuses=%s" %  (Args.StopID, Args.APIID, Args.APIKey, max(3,Args.NumberOfCards),Args.NextBus), conditional=LiveTime.LastServices != None, deadline=LiveTime.CurrentDeadline)
+			# If the data is the same as last time, there is no need to read it again or rebuild the services; only update their times.
+			if response.unchanged:
+				FeedBreaker.Success()
+				LiveTime.LastGoodUpdate = datetime.now()
+				return LiveTime.RefreshLastServices()
+
+			tempServices = json.loads(response.body)
+			for service in tempServices['departures']['all']:
+				# If not in excluded services list, convert custom API object to LiveTime object and add to list.
+				if str(service['line']) not in Args.ExcludeServices:
+					services.append(LiveTime(service, len(services)))
+			# Start looking up the journeys of the services shown first, so they arrive while the services are already being shown. The rest
+			# are looked up as the board gets closer to showing them, see ServiceList.
+			LiveTime.WarmJourneys(services[:ServiceList.AHEAD])
+			LiveTime.LastServices = services
+			LiveTime.LastGoodUpdate = datetime.now()
+			LiveTime.ScheduleNextUpdate(services)
+			Client.commit(response)
+			FeedBreaker.Success()
+			return services
+		except DeadlineExceeded:
+			# The refresh ran out of time or was stopped, such as when the network connection was lost; this says nothing about whether
+			# the API is working, so it is not counted as a failure.
+			print_safe("Ran out of time getting new data %s" % datetime.now().time())
+			return LiveTime.StaleServices()
 		except Exception as e:
 			print("GetData() ERROR")
 			print(str(e))
-			return []
+			LiveTime.NextUpdate = max(LiveTime.NextUpdate, FeedBreaker.Failure())
+			return LiveTime.StaleServices()
+
+
+
+###
+## Service List
+## The services handed to the board. Each service is only worked out, and has its journey looked up, once the board is about to show it;
+## so no hits are spent looking up journeys which are never shown.
+###
+class ServiceList(tuple):
+	# How many services ahead of the one being shown to start looking up the journeys for; one for each row.
+	AHEAD = 3
+
+	def __getitem__(self, index):
+		service = tuple.__getitem__(self, index)
+		# Start looking up the journeys for the services coming up next, so they have arrived by the time they are shown.
+		index = index % len(self)
+		LiveTime.WarmJourneys(tuple.__getitem__(self, slice(index + 1, index + 1 + ServiceList.AHEAD)))
+		return service.Materialise()
+
+
+###
+## Data Fetcher
+## Gets new data from the API on a background thread, so the display can keep animating while it waits on the network.
+###
+class DataFetcher():
+	# How many cards before the end of a cycle to start getting new data, so it is ready for when the cycle wraps round.
+	PREFETCH_CARDS = 3
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.snapshot = None
+		self.worker = None
+		# The deadline of the fetch in progress.
+		self.deadline = None
+
+	# Starts getting new data in the background, unless a request is already in progress.
+	def prefetch(self):
+		if self.is_fetching():
+			return
+		# Each fetch is given its own deadline before it starts, so cancelling always stops the fetch in progress rather than the one before.
+		self.deadline = Deadline(Args.RefreshDeadline)
+		self.worker = threading.Thread(target=self.run, args=(self.deadline,), daemon=True)
+		self.worker.start()
+
+	# Stops the fetch in progress early, if there is one; it then returns whatever it has got so far.
+	def cancel(self):
+		if self.is_fetching():
+			self.deadline.Cancel()
+
+	def is_fetching(self):
+		return self.worker != None and self.worker.is_alive()
+
+	def run(self, deadline):
+		self.publish(LiveTime.GetData(deadline))
+
+	# Stores a completed list of services, it is kept as a tuple so it can not be changed once handed over to the board.
+	def publish(self, services):
+		with self.lock:
+			self.snapshot = ServiceList(services)
+
+	# Returns true or false dependent upon if there is new data which has not yet been shown.
+	def has_new(self):
+		with self.lock:
+			return self.snapshot != None
 
+	# Returns the newest list of services which has not yet been shown, or None if there is nothing new.
+	def take(self):
+		with self.lock:
+			services = self.snapshot
+			self.snapshot = None
+		return services
 
 
 ###
@@ -412,24 +1202,54 @@ class ScrollTime():
 
 	# Generates all the Images (Text boxes) to be drawn on the display.
 	def generateCard(self,service):
+		# What the card was made with, so it is only made again when some of it changes.
+		self.CardText = self.getCardText(service)
 		displayTimeTemp = TextImage(device, service.DisplayTime)
-		IDestinationTemp  = TextImageComplex(device, service.Destination,service.Via, displayTimeTemp.width)
 
-		self.IDestination =  ComposableImage(IDestinationTemp.image.crop((0,0,IDestinationTemp.width + 10,16)), position=(45 if Args.ShowIndex or Args.LargeLineName else 30, 16 * self.position))
-		self.IServiceNumber =  ComposableImage(TextImageServiceNumber(device, service.ServiceNumber).image.crop((0,0,45 if Args.ShowIndex or Args.LargeLineName else 30,16)), position=(0, 16 * self.position))
+		# Reuse the images made the last time the service was shown, unless what is on them has changed since.
+		ImageText = (service.ServiceNumber, service.Destination, service.Via, displayTimeTemp.width)
+		images = self.Controller.CardImages.get(service.ID)
+		if images == None or images[0] != ImageText:
+			IDestinationTemp  = TextImageComplex(device, service.Destination,service.Via, displayTimeTemp.width)
+			images = (ImageText, IDestinationTemp.image.crop((0,0,IDestinationTemp.width + 10,16)), TextImageServiceNumber(device, service.ServiceNumber).image.crop((0,0,45 if Args.ShowIndex or Args.LargeLineName else 30,16)))
+			self.Controller.CardImages[service.ID] = images
+
+		self.IDestination =  ComposableImage(images[1], position=(45 if Args.ShowIndex or Args.LargeLineName else 30, 16 * self.position))
+		self.IServiceNumber =  ComposableImage(images[2], position=(0, 16 * self.position))
 		self.IDisplayTime =  ComposableImage(displayTimeTemp.image, position=(device.width - displayTimeTemp.width, 16 * self.position))
 
+	# Returns what is shown on the card for a service, so it can be told when the card needs making again.
+	def getCardText(self, service):
+		return (service.DisplayTime, service.ServiceNumber, service.Destination, service.Via)
+
 	# Called when you have new/updated information from an API call and want to update the objects predicted arrival time.
 	def updateCard(self, newService, device):
 		self.state = self.SCROLL_DECIDER
 		self.synchroniser.ready(self)
-		self.image_composition.remove_image(self.IDisplayTime)
+		self.retimeCard(newService)
 
-		displayTimeTemp = TextImage(device, newService.DisplayTime)
-		self.IDisplayTime = ComposableImage(displayTimeTemp.image, position=(device.width - displayTimeTemp.width, 16 * self.position))
-	
-		self.image_composition.add_image(self.IDisplayTime)
-		self.image_composition.refresh()
+	# Gives the row new data for the service it is already showing. The card is only made again if what is shown on it has changed, and
+	# where it has scrolled to is kept; so new data does not start the card again.
+	def retimeCard(self, newService):
+		self.CurrentService = newService
+		if self.getCardText(newService) == self.CardText:
+			return
+
+		# The images for the card are only on the display once it has finished opening.
+		showing = self.is_showing()
+		if showing:
+			self.image_composition.remove_image(self.IDestination)
+			self.image_composition.remove_image(self.IServiceNumber)
+			self.image_composition.remove_image(self.IDisplayTime)
+		offset = self.IDestination.offset
+		self.generateCard(newService)
+		self.IDestination.offset = offset
+		self.max_pos = self.IDestination.width
+		if showing:
+			self.image_composition.add_image(self.IDestination)
+			self.image_composition.add_image(self.IServiceNumber)
+			self.image_composition.add_image(self.IDisplayTime)
+			self.image_composition.refresh()
 
 	# Called when you want to change the row from one service to another.
 	def changeCard(self, newService, device):
@@ -483,13 +1303,9 @@ class ScrollTime():
 	# Called upon each time you want to get the next frame for the display.
 	def tick(self):
 		#Update X min till arrival.
-		if self.CurrentService.TimePassedStatic() and (self.state == self.SCROLL_DECIDER or self.state == self.SCROLLING_WAIT or self.state == self.SCROLLING or self.state == self.WAIT_SYNC):
-			self.image_composition.remove_image(self.IDisplayTime)
+		if self.CurrentService.TimePassedStatic() and self.is_showing():
 			self.CurrentService.DisplayTime = self.CurrentService.GetDisplayTime()
-			displayTimeTemp = TextImage(device, self.CurrentService.DisplayTime)
-			self.IDisplayTime = ComposableImage(displayTimeTemp.image, position=(device.width - displayTimeTemp.width, 16 * self.position))           
-			self.image_composition.add_image(self.IDisplayTime)
-			self.image_composition.refresh()
+			self.retimeCard(self.CurrentService)
 
 
 		if self.state == self.WAIT_OPENING:
@@ -521,6 +1337,8 @@ class ScrollTime():
 				if not self.is_waiting():
 					if self.synchroniser.is_synchronised():
 						self.synchroniser.busy(self)
+						# The Via message and destination may have arrived since the card was made, so make it again with them before scrolling it.
+						self.retimeCard(self.CurrentService)
 						if Args.ReducedAnimations:
 							self.state = self.WAIT_SYNC
 						elif self.CurrentService.ID == "0":
@@ -596,6 +1414,10 @@ class ScrollTime():
 	def addPartner(self, partner):
 		self.partner = partner
 
+	# Returns true or false dependent upon if the card's images are on the display, they are from when it finishes opening until it is changed.
+	def is_showing(self):
+		return self.state == self.SCROLL_DECIDER or self.state == self.SCROLLING_WAIT or self.state == self.SCROLLING or self.state == self.WAIT_SYNC
+
 	# Used to add a time delay between animations.
 	def is_waiting(self):
 		self.ticks += 1
@@ -611,14 +1433,22 @@ class ScrollTime():
 ###
 class boardFixed():
 	def __init__(self, image_composition, scroll_delay, device):
-		self.Services = LiveTime.GetData()   
+		# The board is made from the data already got in the background, if there is any, so the display never waits on the network. If
+		# there is none yet it shows that there are no services while new data is got, and is made again once it arrives; see is_waiting.
+		self.Services = Fetcher.take() or ()
+		if LiveTime.TimePassed():
+			Fetcher.prefetch()
 		self.synchroniser = Synchroniser()
 		self.scroll_delay = scroll_delay
 		self.image_composition = image_composition
 		self.device = device
 		self.ticks = 0
+		# The images made for each service shown, so they can be used again the next time it is shown; see ScrollTime.generateCard.
+		self.CardImages = {}
 		self.setInitalCards()
 		self.State = "alive"
+		# True while waiting on new data got after the network connection came back, to be shown as soon as it arrives.
+		self.Refreshing = False
 	
 		NoServiceTemp = NoService(device)
 		self.NoServices = ComposableImage(NoServiceTemp.image, position=(int(device.width/2- NoServiceTemp.width/2),int(device.height/2-NoServiceTemp.height/2)))
@@ -661,9 +1491,28 @@ class boardFixed():
 		# If it has cycled through all cards, cycle from start again, unless enough time has passed for a new API request.
 		if (self.x > Args.NumberOfCards or self.x >len(self.Services)-1):
 			self.x = 1 if Args.FixToArrive else 0
-			if LiveTime.TimePassed():  
-				self.Services = LiveTime.GetData()
-				print_safe("New Data Retrieved %s" % datetime.now().time())
+			# Swap in the new data retrieved in the background, if there is any.
+			NewServices = Fetcher.take()
+			if NewServices != None:
+				Changes = self.updateServices(NewServices, False)
+				self.Refreshing = False
+				print_safe("New Data Retrieved %s - %s - %s, %s" % (datetime.now().time(), Changes, Client.stats(), Quota.stats()))
+
+		# Once the network connection comes back start getting new data straight away, and show it as soon as it arrives rather than at the end of the cycle.
+		if Network.Refresh and LiveTime.TimePassed():
+			Network.Refresh = False
+			self.Refreshing = True
+			Fetcher.prefetch()
+		elif self.Refreshing:
+			NewServices = Fetcher.take()
+			if NewServices != None:
+				Changes = self.updateServices(NewServices, True)
+				self.Refreshing = False
+				print_safe("New Data Retrieved %s - %s" % (datetime.now().time(), Changes))
+
+		# Start getting new data shortly before the end of the cycle, so it is ready for when the cycle wraps round.
+		if LiveTime.TimePassed() and self.x >= min(Args.NumberOfCards, len(self.Services)-1) - DataFetcher.PREFETCH_CARDS:
+			Fetcher.prefetch()
 
 		# If there are more rows (3) than there is services scheduled show nothing.
 		if row > len(self.Services):       
@@ -692,13 +1541,45 @@ class boardFixed():
 		if  not (Args.FixToArrive and row == 1):
 			self.x = self.x + 1
 
-	# Used to add a time delay if there was an error with the last API request (providing a back off and wait mechanism)
+	# Swaps in new data for the board, working out what has changed since the last data rather than starting again. Rows showing a service
+	# which is still coming are given its new data straight away, only making the card again if what is shown on it has changed; the images
+	# kept for services which have gone are thrown away; and if 'keepPlace' the cycle carries on from the service which was going to be
+	# shown next, wherever it now is. Returns a summary of what changed.
+	def updateServices(self, NewServices, keepPlace):
+		OldIDs = [service.ID for service in self.Services]
+		OldTimes = {service.ID: service.ExptArrival for service in self.Services}
+		NewIDs = {}
+		NewTimes = {}
+		for index, service in enumerate(NewServices):
+			NewIDs.setdefault(service.ID, index)
+			NewTimes.setdefault(service.ID, service.ExptArrival)
+
+		if keepPlace and len(OldIDs) > 0 and OldIDs[self.x % len(OldIDs)] in NewIDs:
+			self.x = max(1 if Args.FixToArrive else 0, NewIDs[OldIDs[self.x % len(OldIDs)]])
+
+		for row in (self.top, self.middel, self.bottom):
+			if row.CurrentService.ID in NewIDs:
+				row.retimeCard(NewServices[NewIDs[row.CurrentService.ID]])
+
+		self.CardImages = {ID: images for ID, images in self.CardImages.items() if ID in NewIDs}
+		self.Services = NewServices
+
+		kept = [ID for ID in dict.fromkeys(OldIDs) if ID in NewIDs]
+		retimed = len([ID for ID in kept if OldTimes[ID] != NewTimes[ID]])
+		reordered = kept != sorted(kept, key=NewIDs.get)
+		return "%d added, %d removed, %d re-timed%s" % (len(NewIDs) - len(kept), len(set(OldIDs)) - len(kept), retimed, ", reordered" if reordered else "")
+
+	# Used to add a time delay if there was an error with the last API request or there were no services, until the time picked for the next
+	# API data call; which backs off after failures in a row (providing a back off and wait mechanism). The new data is got in the background
+	# so the display keeps running, and the wait is over once it has been got.
 	def is_waiting(self):
 		self.ticks += 1
-		if self.ticks > Args.RecoveryTime:
+		if LiveTime.TimePassed():
+			Fetcher.prefetch()
+		if Fetcher.has_new():
 			self.ticks = 0
 			return False
-		return True	
+		return True
 		
 
 # Used to work out if the current time is between the inactive hours.
@@ -728,6 +1609,9 @@ if Args.Display == 'gifanim':
 	device._max_frames = int(Args.maxframes)
 
 image_composition = ImageComposition(device)
+Fetcher = DataFetcher()
+if not Args.IgnoreNetwork:
+	Network.start()
 board = boardFixed(image_composition,Args.Delay,device)
 FontTime = ImageFont.truetype("%s/resources/time.otf"  % (os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))),16)
 device.contrast(255)
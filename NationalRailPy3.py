@@ -7,15 +7,21 @@
 import time
 import inspect, os
 import sys
+import shutil
+import hashlib
 import inflect
 import re
+import threading
+import random
 import argparse
 from PIL import ImageFont, Image, ImageDraw
 from luma.core.render import canvas
 from luma.core import cmdline
-from datetime import datetime
+from datetime import datetime, timedelta
+from urllib.request import urlopen
+from urllib.parse import urljoin
 from luma.core.image_composition import ImageComposition, ComposableImage
-from nredarwin.webservice import DarwinLdbSession
+from nredarwin.webservice import DarwinLdbSession, StationBoard, ServiceDetails
 
 
 ###
@@ -57,8 +63,17 @@ parser.add_argument("-d", "--Delay",
                     help="How long the display will pause before starting the next animation; default is 30, must be greater than 0.",
                     type=check_positive, default=30)
 parser.add_argument("-r", "--RecoveryTime",
-                    help="How long the display will wait before attempting to get new data again after previously failing; default is 100, must be greater than 0.",
-                    type=check_positive, default=100)
+                    help="How long, in seconds, the display will wait before attempting to get new data again after previously failing. This doubles after each failure in a row, up to the 'MaxRecoveryTime'; default is 10, must be greater than 0.",
+                    type=check_positive, default=10)
+parser.add_argument("--RefreshDeadline",
+                    help="The longest time, in seconds, one refresh of the data can take; including the main request and any look ups which follow it, such as for each train's calling points. Anything not retrieved in time is left out until the next refresh; default is 30.",
+                    type=check_positive, default=30)
+parser.add_argument("--StaleLimit",
+                    help="If new data can not be retrieved, how long, in seconds, the display will keep showing the last data it got; counting down the times from when each train was expected and leaving off any which have already left. After this nothing is shown until new data is retrieved; default is 600.",
+                    type=check_positive, default=600)
+parser.add_argument("--MaxRecoveryTime",
+                    help="The longest time, in seconds, the display will wait before attempting to get new data again after failing many times in a row; default is 600, must be greater than 0.",
+                    type=check_positive, default=600)
 parser.add_argument("-n", "--NumberOfCards",
                     help="The maximum number of cards you will see before forcing a new data retrieval, a limit is recommend to prevent cycling through data which may become out of data or going too far into scheduled trains; default is 9, must be greater than 0.",
                     type=check_positive, default=9)
@@ -67,6 +82,11 @@ parser.add_argument("-y", "--Rotation", help="Defines which way up the screen is
 parser.add_argument("-l", "--RequestLimit",
                     help="Defines the minium amount of time the display must wait before making a new data request; default is 55(seconds)",
                     type=check_positive, default=55)
+parser.add_argument("--MaxRequestLimit",
+                    help="Defines the maximum amount of time the display will wait before making a new data request. The display requests new data more often the sooner the next train is due, down to the 'RequestLimit', and waits this long when there are no trains at all; default is 900(seconds)",
+                    type=check_positive, default=900)
+parser.add_argument("--FixedRequestLimit", dest='FixedRequestLimit', action='store_true',
+                    help="Always make a new data request every 'RequestLimit' seconds, instead of changing how often based upon how soon the next train is due.")
 parser.add_argument("-z", "--StaticUpdateLimit",
                     help="Defines the amount of time the display will wait before updating the expected arrival time (based upon it's last known predicted arrival time); default is  15(seconds), this should be lower than your 'RequestLimit'",
                     type=check_positive, default=15)
@@ -102,6 +122,10 @@ parser.add_argument("--FixNextToArrive", dest='FixToArrive', action='store_true'
                     help="Keep the train next arrive at the very top of the display until it has left; by default false")
 parser.add_argument('--no-splashscreen', dest='SplashScreen', action='store_false',
                     help="Do you wish to see the splash screen at start up; recommended and on by default.")
+parser.add_argument("--IgnoreNetwork", dest="IgnoreNetwork", action="store_true",
+                    help="Used to keep making requests even when the Pi does not appear to be connected to a network. By default no requests are made while there is no connection and new data is got as soon as it comes back.")
+parser.add_argument("--Proxy", default=None,
+                    help="The address of a Departure Board Proxy (ProxyPy3.py) on your network, such as 'http://192.168.1.10:8080'. Requests to the API are sent through it, so boards showing the same station share them; by default the API is used directly.")
 parser.add_argument("--Display", default="ssd1322", choices=['ssd1322', 'pygame', 'capture', 'gifanim'],
                     help="Used for development purposes, allows you to switch from a physical display to a virtual emulated one; default 'ssd1322'")
 parser.add_argument("--max-frames", default=60, dest='maxframes', type=check_positive,
@@ -116,6 +140,16 @@ parser.add_argument("--PartialAnimations",
 parser.add_argument("--SortByActual",
                     help="By default services will be displayed in the order of their scheduled departure time. Use this flag to sort by their Actual/Expected departure time if this is known.",
                     dest='SortByActual', action='store_true')
+parser.add_argument("--BoardType", default="departures", choices=['departures', 'arrivals', 'both'],
+                    help="Which trains to show. departures- trains leaving the station. arrivals- trains arriving at the station. both- trains arriving at or leaving the station. default is departures.")
+parser.add_argument("--FilterStation", type=str, default=None,
+                    help="The Station Code of another station, only trains which also call there are shown; for example to only show trains towards London. By default every train is shown.")
+parser.add_argument("--FilterType", default="to", choices=['to', 'from'],
+                    help="If using a 'FilterStation', to- only show trains going to that station. from- only show trains which have come from that station. default is to.")
+parser.add_argument("--Rows", type=check_positive, default=None,
+                    help="The number of trains to ask National Rail for. By default only as many as can be shown are asked for; the 'NumberOfCards', or twice that if any platforms are excluded. At most 10 can be asked for when using the 'details' FetchMode.")
+parser.add_argument("--FetchMode", default="details", choices=['details', 'individual'],
+                    help="How the calling points for each service are retrieved. details- get the board and the calling points of every service in a single request. individual- get the board first, then make a separate request for each service's calling points. default is details.")
 
 # Defines the required paramaters
 requiredNamed = parser.add_argument_group('required named arguments')
@@ -164,6 +198,31 @@ BasicFont = ImageFont.truetype(
 StationName = ""
 
 
+###
+## Deadline
+###
+# Limits how long one refresh of the data can take in total, including the main request and every look up which follows it.
+# It can also be cancelled, after which it acts as if it has run out of time.
+class Deadline():
+    def __init__(self, seconds):
+        self.expires = time.monotonic() + seconds
+        self.cancelled = False
+
+    def Cancel(self):
+        self.cancelled = True
+
+    # Returns how many seconds are left before the deadline.
+    def Remaining(self):
+        return 0 if self.cancelled else max(0, self.expires - time.monotonic())
+
+    def Expired(self):
+        return self.Remaining() <= 0
+
+# Raised when a request is stopped because its deadline has passed.
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
 ###
 # Below contains the class which is used to reperesent one instance of a service record. It is also responsible for getting the information from the Transport API.
 ###
@@ -192,6 +251,22 @@ class LiveTimeStud():
 class LiveTime(object):
     # The last time an API call was made to get new data.
     LastUpdate = datetime.now()
+    # The time at which the next API call should be made.
+    NextUpdate = datetime.now()
+    # How soon the next train must be due, in seconds, before polling as often as the RequestLimit allows.
+    SOON = 5 * 60
+    # The last list of services successfully retrieved, shown again if new data can not be retrieved.
+    LastServices = None
+    # The last time new data was successfully retrieved from the API.
+    LastGoodUpdate = None
+    # The deadline for the refresh in progress, which every request made as part of it must finish by.
+    CurrentDeadline = None
+    # How long after a train was expected, in seconds, before it is left off when showing old data.
+    DEPARTED = 60
+
+    # Only these are stored for each train, so the many trains made on each refresh are kept small.
+    __slots__ = ("Index", "Destination", "SchArrival", "ExptArrival", "SchTime", "ExptTime", "DisplayTime", "CallingAt", "Platform", "ID",
+                 "Operator", "DisplayText", "LastStaticUpdate")
 
     # * Change this method to implement your own API *
     def __init__(self, Data, Index, serviceC):
@@ -200,6 +275,9 @@ class LiveTime(object):
         self.SchArrival = self.GetArrivalTime(Data)
         # The text displayed showing the status of the train, ie, "On time", "Canceled" or "XX:XX"
         self.ExptArrival = self.GetExpectedArrivalTime(Data)
+        # When the train is scheduled and expected, in seconds since the epoch; the expected time is None if the train is delayed or cancelled.
+        self.SchTime = LiveTime.ParseClock(self.SchArrival)
+        self.ExptTime = self.SchTime if self.ExptArrival == 'On time' else LiveTime.ParseClock(self.ExptArrival)
         self.DisplayTime = self.GetExptTime()
         # The text displayed showing where the train will be stopping at along the way.
         self.CallingAt = str([cp.location_name for cp in Data.subsequent_calling_points]).replace(']', '').replace('[',
@@ -238,9 +316,7 @@ class LiveTime(object):
         if Args.ShowIndex:
             msg += self.Index + ' '
         if Args.Design == 'full':
-            msg += datetime.strptime(str(datetime.now().date()) + " " + self.SchArrival,
-                                     '%Y-%m-%d %H:%M').time().strftime(
-                "%H:%M" if (Args.TimeFormat == 24) else "%I:%M") + ' '
+            msg += (LiveTime.FormatClock(self.SchTime) if self.SchTime != None else self.SchArrival) + ' '
         if not Args.HidePlatform:
             msg += self.Platform
             msg += ' ' * (4 - len(self.Platform))
@@ -249,92 +325,577 @@ class LiveTime(object):
 
     # Returns the string to display for the predicted arrival text box
     def GetExptTime(self):
-        self.LastStaticUpdate = datetime.now()
+        self.LastStaticUpdate = time.time()
 
         if Args.Design == 'full':
-            if re.search('[a-zA-Z]', self.ExptArrival):
+            if re.search('[a-zA-Z]', self.ExptArrival) or self.ExptTime == None:
                 return self.ExptArrival
             else:
-                return datetime.strptime(str(datetime.now().date()) + " " + self.ExptArrival,
-                                         '%Y-%m-%d %H:%M').time().strftime(
-                    "%H:%M" if (Args.TimeFormat == 24) else "%I:%M")
+                return LiveTime.FormatClock(self.ExptTime)
         else:
-            if re.search('[a-zA-Z]', self.ExptArrival) and self.ExptArrival != 'On time':
+            # Delayed, cancelled or otherwise not a time.
+            if self.ExptTime == None:
                 return self.ExptArrival
 
-            ExpTime = self.ExptArrival
-            if self.ExptArrival == 'On time':
-                ExpTime = self.SchArrival
-            try:
-                Diff = (datetime.strptime(ExpTime, "%H:%M").replace(year=datetime.now().year,
-                                                                    month=datetime.now().month,
-                                                                    day=datetime.now().day) - datetime.now()).total_seconds() / 60
-                if Diff <= 1:
-                    return ' Arriving'
-                if Diff >= 15:
-                    return ExpTime
-                return ' %d min' % Diff
-            except Exception as e:
-                print("GetExptTime() ERROR")
-                print(str(e))
+            ExpTime = self.SchArrival if self.ExptArrival == 'On time' else self.ExptArrival
+            Diff = (self.ExptTime - self.LastStaticUpdate) / 60
+            if Diff <= 1:
+                return ' Arriving'
+            if Diff >= 15:
                 return ExpTime
+            return ' %d min' % Diff
+
+    # Converts a time of day given by the API, such as "10:05", into seconds since the epoch; done once when the train is made, so working out how
+    # long is left is only a subtraction. Only the time of day is given, so it is taken to be the one closest to now, for trains around midnight.
+    # Returns None if it is not a time, such as "Delayed".
+    @staticmethod
+    def ParseClock(value):
+        try:
+            clock = datetime.strptime(value, "%H:%M").time()
+        except (ValueError, TypeError):
+            return None
+        now = datetime.now()
+        arrival = datetime.combine(now.date(), clock)
+        if (now - arrival).total_seconds() > 12 * 60 * 60:
+            arrival += timedelta(days=1)
+        elif (arrival - now).total_seconds() > 12 * 60 * 60:
+            arrival -= timedelta(days=1)
+        return arrival.timestamp()
+
+    # Returns the local time of day, as shown on the display, of a time in seconds since the epoch.
+    @staticmethod
+    def FormatClock(seconds):
+        return time.strftime("%H:%M" if (Args.TimeFormat == 24) else "%I:%M", time.localtime(seconds))
 
-    # Returns true or false dependent upon if the last time an API data call was made was over the request limit; to prevent spamming the API feed.
+    # Returns true or false dependent upon if the time picked for the next API data call has been reached; to prevent spamming the API feed.
     @staticmethod
     def TimePassed():
-        return (datetime.now() - LiveTime.LastUpdate).total_seconds() > Args.RequestLimit
+        return datetime.now() >= LiveTime.NextUpdate
+
+    # Picks when the next API call should be made based upon how soon the next train is due. Polls as often as the RequestLimit allows when a train
+    # is about to arrive, less often the further away the next train is and only every MaxRequestLimit when there are no trains at all.
+    @staticmethod
+    def ScheduleNextUpdate(services):
+        interval = Args.RequestLimit
+        if not Args.FixedRequestLimit:
+            due = [seconds for seconds in (service.SecondsUntilArrival() for service in services) if seconds != None]
+            if len(due) == 0:
+                interval = Args.MaxRequestLimit
+            elif min(due) > LiveTime.SOON:
+                interval = min(due) / 3
+        LiveTime.NextUpdate = LiveTime.LastUpdate + timedelta(seconds=max(Args.RequestLimit, min(interval, Args.MaxRequestLimit)))
+
+    # Returns how many seconds until the train is expected, using the scheduled time if it is delayed or cancelled. None if it can not be worked out.
+    def SecondsUntilArrival(self):
+        ExpTime = self.ExptTime if self.ExptTime != None else self.SchTime
+        return None if ExpTime == None else ExpTime - time.time()
 
     # Return true or false dependent upon if the last time the display was updated was over the static update limit. This prevents updating the display to frequently to increase performance.
     def TimePassedStatic(self):
-        return ("min" in self.ExptArrival) and (
-                    datetime.now() - self.LastStaticUpdate).total_seconds() > Args.StaticUpdateLimit
+        return ("min" in self.ExptArrival) and time.time() - self.LastStaticUpdate > Args.StaticUpdateLimit
 
     @staticmethod
     def sort_key(train):
-        def convert_to_datetime(time_str):
+        real_departure = LiveTime.ParseClock(train.etd) if train.etd is not None else LiveTime.ParseClock(train.eta)
+        scheduled_departure = LiveTime.ParseClock(train.std) if train.std is not None else LiveTime.ParseClock(train.sta)
+
+        return (real_departure if real_departure is not None else scheduled_departure)
+
+    # The SOAP operations for each BoardType; the first gets just the board, the second also includes the details of every train on it.
+    BOARDS = {"departures": ("GetDepartureBoard", "GetDepBoardWithDetails"),
+              "arrivals": ("GetArrivalBoard", "GetArrBoardWithDetails"),
+              "both": ("GetArrivalDepartureBoard", "GetArrDepBoardWithDetails")}
+
+    # Returns the settings sent with a board request, so National Rail only sends the trains the display will show; up to maxRows of them.
+    @staticmethod
+    def BoardQuery(maxRows):
+        rows = Args.Rows if Args.Rows != None else Args.NumberOfCards * (2 if Args.ExcludedPlatforms else 1)
+        query = {"crs": Args.StationID, "numRows": min(rows, maxRows)}
+        if Args.FilterStation != None:
+            query["filterCrs"] = Args.FilterStation.upper()
+            query["filterType"] = Args.FilterType
+        return query
+
+    # Gets the station board and, when using the 'details' fetch mode, the details of every service on it in the same request.
+    # Returns the board along with a list of the details for each train service, None for any which still need looking up on their own.
+    @staticmethod
+    def GetBoard(darwin_sesh):
+        if Args.FetchMode == 'details' and DarwinSession.CanQuery(darwin_sesh) and DetailsBreaker.Allow():
             try:
-                return datetime.strptime(time_str, "%H:%M")
-            except (ValueError, TypeError):
-                return None
+                DarwinSession.Limit(LiveTime.CurrentDeadline)
+                # A board with details can contain at most 10 services.
+                soap_response = DarwinSession.Query(darwin_sesh, LiveTime.BOARDS[Args.BoardType][1], LiveTime.BoardQuery(10))
+                rows = getattr(getattr(soap_response, "trainServices", None), "service", [])
+                DetailsBreaker.Success()
+                return StationBoard(soap_response), [ServiceDetails(row) for row in rows]
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                # A request cut short by the deadline times out, that is not a failure of the board with details.
+                if LiveTime.CurrentDeadline.Expired():
+                    raise DeadlineExceeded("Ran out of time getting the board from National Rail")
+                print("GetBoard() ERROR, looking up each service individually instead")
+                print(str(e))
+                DetailsBreaker.Failure()
 
-        real_departure = convert_to_datetime(train.etd) if train.etd is not None else convert_to_datetime(train.eta)
-        scheduled_departure = convert_to_datetime(train.std) if train.std is not None else convert_to_datetime(
-            train.sta)
+        DarwinSession.Limit(LiveTime.CurrentDeadline)
+        # A board on its own can contain at most 150 services.
+        board = DarwinSession.GetStationBoard(darwin_sesh, LiveTime.BoardQuery(150))
+        return board, [None] * len(board.train_services)
 
-        return (real_departure if real_departure is not None else scheduled_departure)
+    # Gets the details of a single train service, or None if they could not be retrieved.
+    @staticmethod
+    def GetServiceDetails(darwin_sesh, service_id):
+        # Don't make a request if the API has been failing, until it is time to try it again; or if there is no time left in this refresh.
+        if not ServiceBreaker.Allow() or LiveTime.CurrentDeadline.Expired():
+            return None
+        try:
+            DarwinSession.Limit(LiveTime.CurrentDeadline)
+            service = darwin_sesh.get_service_details(service_id)
+            ServiceBreaker.Success()
+            return service
+        except DeadlineExceeded:
+            return None
+        except Exception as e:
+            # A request cut short by the deadline times out, that is not a failure of the API.
+            if LiveTime.CurrentDeadline.Expired():
+                return None
+            print("GetServiceDetails() ERROR")
+            print(str(e))
+            ServiceBreaker.Failure()
+            return None
+
+    # Used when new data can not be retrieved, keeps showing the last services retrieved with their times worked out again from when they were expected,
+    # leaving off any which have already left. Once the data is older than the 'StaleLimit' nothing is shown instead.
+    @staticmethod
+    def StaleServices():
+        if LiveTime.LastServices == None or (datetime.now() - LiveTime.LastGoodUpdate).total_seconds() > Args.StaleLimit:
+            return []
+        services = [service for service in LiveTime.LastServices if service.SecondsUntilArrival() == None or service.SecondsUntilArrival() > -LiveTime.DEPARTED]
+        for service in services:
+            service.DisplayTime = service.GetExptTime()
+        print_safe("Unable to get new data, showing the data retrieved at %s" % LiveTime.LastGoodUpdate.time())
+        return services
 
     # Calls the API and gets the data from it, returning a list of LiveTime objects to be used in the program.
     # * Change this method to implement your own API *
     @staticmethod
-    def GetData():
+    def GetData(deadline):
         LiveTime.LastUpdate = datetime.now()
+        # Every request made as part of this refresh must finish by the deadline, given by the DataFetcher so it can stop it early.
+        LiveTime.CurrentDeadline = deadline
+        # If the request fails try again as soon as the RequestLimit allows.
+        LiveTime.NextUpdate = LiveTime.LastUpdate + timedelta(seconds=Args.RequestLimit)
         services = []
 
+        # Don't make a request while there is no network connection, new data is got as soon as it comes back.
+        if not Network.Online:
+            return LiveTime.StaleServices()
+
+        # Don't make a request if the API has been failing, until it is time to try it again.
+        if not FeedBreaker.Allow():
+            LiveTime.NextUpdate = max(LiveTime.NextUpdate, FeedBreaker.RetryAt)
+            return LiveTime.StaleServices()
+
         try:
-            darwin_sesh = DarwinLdbSession(wsdl="https://lite.realtime.nationalrail.co.uk/OpenLDBWS/wsdl.aspx",
-                                           api_key=Args.APIToken)
-            board = darwin_sesh.get_station_board(Args.StationID)
+            darwin_sesh = DarwinSession.Get(LiveTime.CurrentDeadline)
+            board, details = LiveTime.GetBoard(darwin_sesh)
+            FeedBreaker.Success()
             global StationName
             StationName = board.location_name
 
+            sorted_train_list = list(zip(board.train_services, details))
             # Sort by the actual expected departure time, instead of the scheduled.
             if Args.SortByActual:
-                sorted_train_list = sorted(board.train_services, key=LiveTime.sort_key)
-            else:
-                sorted_train_list = board.train_services
+                sorted_train_list = sorted(sorted_train_list, key=lambda train: LiveTime.sort_key(train[0]))
 
-            for serviceC in sorted_train_list:
+            for serviceC, service in sorted_train_list:
                 if len(services) >= Args.NumberOfCards:
                     break
-                service = darwin_sesh.get_service_details(serviceC.service_id)
+                # Only look up the service on its own if its details did not come with the board.
+                if service == None:
+                    service = LiveTime.GetServiceDetails(darwin_sesh, serviceC.service_id)
+                    # Leave the train off the board until its details can be retrieved.
+                    if service == None:
+                        continue
                 if (service.sta != None or service.std != None) and str(service.platform) not in Args.ExcludedPlatforms:
                     services.append(LiveTime(service, len(services) + 1, serviceC))
 
+            LiveTime.LastServices = services
+            LiveTime.LastGoodUpdate = datetime.now()
+            LiveTime.ScheduleNextUpdate(services)
             return services
         except Exception as e:
+            # The refresh ran out of time or was stopped, such as when the network connection was lost; this says nothing about whether
+            # the API or the session is working, so neither is counted as failing. A request cut short by the deadline times out rather
+            # than raising DeadlineExceeded.
+            if isinstance(e, DeadlineExceeded) or LiveTime.CurrentDeadline.Expired():
+                print_safe("Ran out of time getting new data %s" % datetime.now().time())
+                return LiveTime.StaleServices()
             print("GetData() ERROR")
             print(str(e))
-            return []
+            # The session may be the cause of the failure, so make a new one next time.
+            DarwinSession.Reset()
+            LiveTime.NextUpdate = max(LiveTime.NextUpdate, FeedBreaker.Failure())
+            return LiveTime.StaleServices()
+
+
+###
+## Darwin Session
+## Keeps one session with the National Rail API open for the whole program, instead of creating a new one on every refresh.
+## Creating a session downloads and parses the WSDL, so a copy of it is also saved on disk and only replaced when it changes.
+###
+class DarwinSession():
+    WSDL = "https://lite.realtime.nationalrail.co.uk/OpenLDBWS/wsdl.aspx?ver=2017-10-01"
+    # Where the requests described by the WSDL are sent.
+    SERVICE = "https://lite.realtime.nationalrail.co.uk/OpenLDBWS/ldb11.asmx"
+    # Where the copies of the WSDL are saved, each version is kept in a folder named after a hash of its contents.
+    CACHE_DIR = "%s/cache/wsdl" % (os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe()))))
+    # How often to check the copy of the WSDL on disk still matches the one online, in seconds; default is once a day.
+    CHECK_INTERVAL = 24 * 60 * 60
+    # Finds the other documents the WSDL imports, so they can be saved alongside it.
+    IMPORTS = re.compile(rb'(<[\w:]*(?:import|include)\b[^>]*?\b(?:schemaLocation|location)=")([^"]+)(")')
+
+    # The longest time, in seconds, a single request can take.
+    TIMEOUT = 10
+
+    Session = None
+    Version = None
+    LastChecked = None
+
+    # Returns the current session, only creating a new one if there isn't one yet or the WSDL has changed. Checking for a new WSDL and
+    # creating the session are both part of the refresh, so must finish by its deadline.
+    @staticmethod
+    def Get(deadline):
+        if DarwinSession.LastChecked == None:
+            DarwinSession.LoadCachedVersion()
+        if DarwinSession.LastChecked == None or (datetime.now() - DarwinSession.LastChecked).total_seconds() > DarwinSession.CHECK_INTERVAL:
+            DarwinSession.CheckForNewVersion(deadline)
+
+        if DarwinSession.Session == None:
+            if deadline.Expired():
+                raise DeadlineExceeded("No time left to create a session with National Rail")
+            DarwinSession.Session = DarwinLdbSession(wsdl=DarwinSession.GetWSDLLocation(), api_key=Args.APIToken, timeout=DarwinSession.TIMEOUT)
+            # Send the requests through the proxy, if using one; the proxy passes them on to National Rail.
+            if Args.Proxy != None and not DarwinSession.SetOptions(DarwinSession.Session, location="%s/%s" % (Args.Proxy.rstrip("/"), DarwinSession.SERVICE)):
+                print("Get() ERROR - unable to send the National Rail requests through the proxy with this version of nredarwin, sending them straight to National Rail")
+            print_safe("New Darwin Session Created %s" % datetime.now().time())
+        return DarwinSession.Session
+
+    # Limits how long the next request can take to the time left before the deadline, raising DeadlineExceeded if there is no time left.
+    @staticmethod
+    def Limit(deadline):
+        if deadline.Expired():
+            raise DeadlineExceeded("No time left to make a request to National Rail")
+        DarwinSession.SetOptions(DarwinSession.Session, timeout=min(DarwinSession.TIMEOUT, deadline.Remaining()))
+
+    # nredarwin does not offer a way to send its requests somewhere else, change how long they can take once the session is made, or request
+    # a board with the details of every train on it. SetOptions, CanQuery and Query reach into its SOAP client to do so, and are the only
+    # places that do; if a version of nredarwin does not have it, what nredarwin does offer is used instead.
+    # Changes the settings of the session's SOAP client, returning true or false dependent upon if they could be changed.
+    @staticmethod
+    def SetOptions(darwin_sesh, **options):
+        soap_client = getattr(darwin_sesh, "_soap_client", None)
+        if soap_client == None:
+            return False
+        soap_client.set_options(**options)
+        return True
+
+    # Returns true or false dependent upon if any SOAP operation can be requested, rather than only those nredarwin has a method for.
+    @staticmethod
+    def CanQuery(darwin_sesh):
+        return hasattr(darwin_sesh, "_base_query")
+
+    # Requests a SOAP operation with the settings given, returning the response as it is; see CanQuery.
+    @staticmethod
+    def Query(darwin_sesh, operation, query):
+        return darwin_sesh._base_query()[operation](**query)
+
+    # Returns the station board for the settings given, see LiveTime.BoardQuery.
+    @staticmethod
+    def GetStationBoard(darwin_sesh, query):
+        if DarwinSession.CanQuery(darwin_sesh):
+            return StationBoard(DarwinSession.Query(darwin_sesh, LiveTime.BOARDS[Args.BoardType][0], query))
+        return darwin_sesh.get_station_board(query["crs"], rows=query["numRows"], include_departures=Args.BoardType != "arrivals", include_arrivals=Args.BoardType != "departures",
+                                             destination_crs=query.get("filterCrs") if query.get("filterType") == "to" else None,
+                                             origin_crs=query.get("filterCrs") if query.get("filterType") == "from" else None)
+
+    # Throws away the current session so a new one is made on the next request; used after a request has failed.
+    @staticmethod
+    def Reset():
+        DarwinSession.Session = None
+
+    # Returns where the session should load the WSDL from, the copy on disk if there is one else the National Rail website.
+    @staticmethod
+    def GetWSDLLocation():
+        if DarwinSession.Version != None:
+            path = os.path.join(DarwinSession.CACHE_DIR, DarwinSession.Version, "0.xml")
+            if os.path.exists(path):
+                return "file://" + path
+        return DarwinSession.WSDL
+
+    # Finds the version of the WSDL saved on disk from a previous run, and when it was last checked against the one online.
+    @staticmethod
+    def LoadCachedVersion():
+        current = os.path.join(DarwinSession.CACHE_DIR, "current")
+        try:
+            with open(current) as file:
+                DarwinSession.Version = file.read().strip()
+            DarwinSession.LastChecked = datetime.fromtimestamp(os.path.getmtime(current))
+        except OSError:
+            DarwinSession.Version = None
+
+    # Downloads the WSDL and saves it to disk if it is different to the copy already saved, forcing a new session to be made.
+    @staticmethod
+    def CheckForNewVersion(deadline):
+        LastChecked = DarwinSession.LastChecked
+        DarwinSession.LastChecked = datetime.now()
+        try:
+            documents = DarwinSession.DownloadWSDL(deadline)
+            version = hashlib.sha1(b"".join(documents.values())).hexdigest()[:12]
+            if version != DarwinSession.Version:
+                DarwinSession.SaveWSDL(version, documents)
+                DarwinSession.Version = version
+                DarwinSession.Session = None
+                print_safe("New WSDL Version Saved %s" % version)
+            else:
+                os.utime(os.path.join(DarwinSession.CACHE_DIR, "current"))
+        except DeadlineExceeded:
+            # Ran out of time, so check again on the next refresh.
+            DarwinSession.LastChecked = LastChecked
+        except Exception as e:
+            # Carry on using the copy on disk (if there is one) and try again at the next check.
+            print("CheckForNewVersion() ERROR")
+            print(str(e))
+
+    # Downloads the WSDL along with every document it imports, returning them keyed by their URL in the order they were found. Each is
+    # downloaded through the proxy, if using one, and must finish by the deadline.
+    @staticmethod
+    def DownloadWSDL(deadline):
+        documents = {}
+        queue = [DarwinSession.WSDL]
+        while len(queue) > 0:
+            url = queue.pop(0)
+            if url in documents:
+                continue
+            if deadline.Expired():
+                raise DeadlineExceeded("No time left to download the WSDL")
+            with urlopen(url if Args.Proxy == None else "%s/%s" % (Args.Proxy.rstrip("/"), url), timeout=min(DarwinSession.TIMEOUT, deadline.Remaining())) as conn:
+                documents[url] = conn.read()
+            for match in DarwinSession.IMPORTS.finditer(documents[url]):
+                queue.append(urljoin(url, match.group(2).decode()))
+        return documents
+
+    # Saves each document into a new version folder, pointing the imports between them at the local copies instead.
+    @staticmethod
+    def SaveWSDL(version, documents):
+        folder = os.path.join(DarwinSession.CACHE_DIR, version)
+        os.makedirs(folder, exist_ok=True)
+        names = {}
+        for url in documents:
+            names[url] = "%d.xml" % len(names)
+
+        for url, content in documents.items():
+            content = DarwinSession.IMPORTS.sub(lambda match: match.group(1) + names[urljoin(url, match.group(2).decode())].encode() + match.group(3), content)
+            with open(os.path.join(folder, names[url]), "wb") as file:
+                file.write(content)
+
+        with open(os.path.join(DarwinSession.CACHE_DIR, "current"), "w") as file:
+            file.write(version)
+
+        # Remove any older versions, they will not be used again.
+        for old in os.listdir(DarwinSession.CACHE_DIR):
+            if old != version and os.path.isdir(os.path.join(DarwinSession.CACHE_DIR, old)):
+                shutil.rmtree(os.path.join(DarwinSession.CACHE_DIR, old), ignore_errors=True)
+
+
+###
+## Circuit Breaker
+## Keeps track of whether an API endpoint is working. After a failure no more requests are made to it for a while, this wait doubles
+## after each failure in a row up to the 'MaxRecoveryTime', with a random amount taken off so many displays do not all retry at the same time.
+## The first request to succeed resets it, so an endpoint which has recovered is used again straight away.
+###
+class CircuitBreaker():
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        # The number of failures in a row.
+        self.failures = 0
+        # No requests should be made to the endpoint before this time.
+        self.RetryAt = datetime.now()
+
+    # Returns true or false dependent upon if a request can be made to the endpoint.
+    def Allow(self):
+        with self.lock:
+            return datetime.now() >= self.RetryAt
+
+    def Success(self):
+        with self.lock:
+            if self.failures > 0:
+                print_safe("%s recovered after %d failures" % (self.name, self.failures))
+            self.failures = 0
+
+    # Lets a request be made straight away, used when the cause of the failures has been fixed.
+    def Reset(self):
+        with self.lock:
+            self.failures = 0
+            self.RetryAt = datetime.now()
+
+    # Records a failure, returning the time at which a request can next be made to the endpoint.
+    def Failure(self):
+        with self.lock:
+            self.failures += 1
+            delay = min(Args.MaxRecoveryTime, Args.RecoveryTime * 2 ** min(self.failures - 1, 16))
+            delay = random.uniform(delay / 2, delay)
+            self.RetryAt = datetime.now() + timedelta(seconds=delay)
+            print_safe("%s failed %d time(s) in a row, waiting %ds before trying again" % (self.name, self.failures, delay))
+            return self.RetryAt
+
+FeedBreaker = CircuitBreaker("GetDepartureBoard")
+DetailsBreaker = CircuitBreaker("GetDepBoardWithDetails")
+ServiceBreaker = CircuitBreaker("GetServiceDetails")
+
+
+###
+## Network Monitor
+## Watches whether the Pi is connected to a network, by checking it has a default route through an interface which is plugged in or
+## connected to Wi-Fi. While it is not no requests are made, as they could only fail after waiting to connect; once the connection comes
+## back new data is got straight away, instead of waiting out the time picked for the next request or the back off after the failures.
+###
+class NetworkMonitor():
+    # How often to check the connection, in seconds.
+    INTERVAL = 1
+    ROUTES = "/proc/net/route"
+    IPV6_ROUTES = "/proc/net/ipv6_route"
+    # Route flags, see linux/route.h.
+    RTF_UP = 0x0001
+    RTF_REJECT = 0x0200
+
+    def __init__(self, breakers):
+        self.breakers = breakers
+        self.Online = True
+        # Set when the connection comes back, until the board has started getting new data.
+        self.Refresh = False
+
+    # Starts checking the connection in the background.
+    def start(self):
+        self.Online = NetworkMonitor.Connected()
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def run(self):
+        while True:
+            time.sleep(NetworkMonitor.INTERVAL)
+            online = NetworkMonitor.Connected()
+            if online == self.Online:
+                continue
+            self.Online = online
+            if online:
+                print_safe("Network connection restored %s, getting new data" % datetime.now().time())
+                self.Reconnected()
+            else:
+                print_safe("Network connection lost %s, showing the last data retrieved until it comes back" % datetime.now().time())
+                # Stop any request in progress, it can not finish now.
+                Fetcher.cancel()
+
+    # Forgets the failures made while there was no connection and gets new data now.
+    def Reconnected(self):
+        for breaker in self.breakers:
+            breaker.Reset()
+        LiveTime.NextUpdate = datetime.now()
+        self.Refresh = True
+
+    # Returns true or false dependent upon if there is a default route which is up, through an interface which has a carrier.
+    # If the routes can not be read, such as when not running on Linux, the connection is assumed to be working.
+    @staticmethod
+    def Connected():
+        try:
+            with open(NetworkMonitor.ROUTES) as routes:
+                next(routes)
+                for route in routes:
+                    # Iface, Destination, Gateway, Flags, RefCnt, Use, Metric, Mask...
+                    fields = route.split()
+                    if fields[1] == "00000000" and fields[7] == "00000000" and int(fields[3], 16) & NetworkMonitor.RTF_UP and NetworkMonitor.Carrier(fields[0]):
+                        return True
+        except OSError:
+            return True
+        try:
+            with open(NetworkMonitor.IPV6_ROUTES) as routes:
+                for route in routes:
+                    # Destination, Prefix length, Source, Source prefix length, Next hop, Metric, RefCnt, Use, Flags, Iface.
+                    fields = route.split()
+                    flags = int(fields[8], 16)
+                    if fields[1] == "00" and fields[9] != "lo" and flags & NetworkMonitor.RTF_UP and not flags & NetworkMonitor.RTF_REJECT and NetworkMonitor.Carrier(fields[9]):
+                        return True
+        except OSError:
+            pass
+        return False
+
+    # Returns true or false dependent upon if the interface is plugged in or connected to Wi-Fi. Interfaces which do not report it, such
+    # as VPNs, are assumed to be connected; the kernel refuses to report it for an interface which is down.
+    @staticmethod
+    def Carrier(interface):
+        try:
+            with open("/sys/class/net/%s/carrier" % interface) as carrier:
+                return carrier.read().strip() == "1"
+        except FileNotFoundError:
+            return True
+        except OSError:
+            return False
+
+Network = NetworkMonitor([FeedBreaker, DetailsBreaker, ServiceBreaker])
+
+
+###
+## Data Fetcher
+## Gets new data from the API on a background thread, so the display can keep animating while it waits on the network.
+###
+class DataFetcher():
+    # How many cards before the end of a cycle to start getting new data, so it is ready for when the cycle wraps round.
+    PREFETCH_CARDS = 3
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.worker = None
+        # The deadline of the fetch in progress.
+        self.deadline = None
+
+    # Starts getting new data in the background, unless a request is already in progress.
+    def prefetch(self):
+        if self.is_fetching():
+            return
+        # Each fetch is given its own deadline before it starts, so cancelling always stops the fetch in progress rather than the one before.
+        self.deadline = Deadline(Args.RefreshDeadline)
+        self.worker = threading.Thread(target=self.run, args=(self.deadline,), daemon=True)
+        self.worker.start()
+
+    # Stops the fetch in progress early, if there is one; it then returns whatever it has got so far.
+    def cancel(self):
+        if self.is_fetching():
+            self.deadline.Cancel()
+
+    def is_fetching(self):
+        return self.worker != None and self.worker.is_alive()
+
+    def run(self, deadline):
+        self.publish(LiveTime.GetData(deadline))
+
+    # Stores a completed list of services, it is kept as a tuple so it can not be changed once handed over to the board.
+    def publish(self, services):
+        with self.lock:
+            self.snapshot = tuple(services)
+
+    # Returns true or false dependent upon if there is new data which has not yet been shown.
+    def has_new(self):
+        with self.lock:
+            return self.snapshot != None
+
+    # Returns the newest list of services which has not yet been shown, or None if there is nothing new.
+    def take(self):
+        with self.lock:
+            services = self.snapshot
+            self.snapshot = None
+        return services
 
 
 ###
@@ -532,11 +1093,24 @@ class ScrollTime():
 
     # Generates all the Images (Text boxes) to be drawn on the display.
     def generateCard(self, service):
+        # What the card was made with, so it is only made again when some of it changes.
+        self.CardText = self.getCardText(service)
         displayTimeTemp = TextImage(device, service.DisplayTime)
-        displayInfoTemp = TextImage(device, service.DisplayText)
 
-        sizeRemaining = device.width - (displayTimeTemp.width + displayInfoTemp.width)
-        displayDestinationTemp = VariableTextImage(device, service.Destination, sizeRemaining)
+        # Reuse the images made the last time the train was shown, unless what is on them has changed since; the destination is sized to
+        # fit the space left by the time, so it is made again if the time changes width.
+        ImageText = (service.DisplayText, service.Destination, service.CallingAt, displayTimeTemp.width)
+        images = self.Controller.CardImages.get(service.ID)
+        if images == None or images[0] != ImageText:
+            displayInfoTemp = TextImage(device, service.DisplayText)
+            sizeRemaining = device.width - (displayTimeTemp.width + displayInfoTemp.width)
+            displayDestinationTemp = VariableTextImage(device, service.Destination, sizeRemaining)
+            TempSCallingAt = TextImage(device, "Calling at:")
+            TempICallingAt = LongTextImage(device, service.CallingAt)
+            images = (ImageText, displayInfoTemp, displayDestinationTemp, TempSCallingAt,
+                      TempICallingAt.image.crop((0, 0, max(TempICallingAt.width + 3, 256), FontSize)), TempICallingAt.width + 3)
+            self.Controller.CardImages[service.ID] = images
+        displayInfoTemp, displayDestinationTemp, TempSCallingAt = images[1:4]
 
         self.IDisplayText = ComposableImage(displayInfoTemp.image, position=(0, Offset + (FontSize * self.position)))
         self.IDestintion = ComposableImage(displayDestinationTemp.image,
@@ -544,37 +1118,53 @@ class ScrollTime():
         self.IDisplayTime = ComposableImage(displayTimeTemp.image, position=(
         device.width - displayTimeTemp.width, Offset + (FontSize * self.position)))
 
-        TempSCallingAt = TextImage(device, "Calling at:")
-        TempICallingAt = LongTextImage(device, service.CallingAt)
         self.DirectService = ',' not in service.CallingAt
-        self.ICallingAt = ComposableImage(
-            TempICallingAt.image.crop((0, 0, max(TempICallingAt.width + 3, 256), FontSize)),
+        self.ICallingAt = ComposableImage(images[4],
             position=(TempSCallingAt.width + 3, Offset + (FontSize * self.position)))
         self.SCallingAt = ComposableImage(TempSCallingAt.image.crop((0, 0, TempSCallingAt.width, FontSize)),
                                           position=(0, Offset + (FontSize * self.position)))
-        self.max_pos = TempICallingAt.width + 3
+        self.max_pos = images[5]
+
+    # Returns what is shown on the card for a train, so it can be told when the card needs making again.
+    def getCardText(self, service):
+        return (service.DisplayTime, service.DisplayText, service.Destination, service.CallingAt)
 
     # Called when you have new/updated information from an API call and want to update the objects predicted arrival time.
     def updateCard(self, newService, device):
         self.state = self.SCROLL_DECIDER
         self.synchroniser.ready(self)
-        self.image_composition.remove_image(self.IDisplayTime)
-        self.image_composition.remove_image(self.IDestintion)
-
-        displayTimeTemp = TextImage(device, newService.DisplayTime)
-        self.IDisplayTime = ComposableImage(displayTimeTemp.image, position=(
-        device.width - displayTimeTemp.width, Offset + (FontSize * self.position)))
-
-        tempDisplayText = TextImage(device, newService.DisplayText)
-        sizeRemaining = device.width - (displayTimeTemp.width + tempDisplayText.width)
+        self.retimeCard(newService)
 
-        displayDestinationTemp = VariableTextImage(device, newService.Destination, sizeRemaining)
-        self.IDestintion = ComposableImage(displayDestinationTemp.image,
-                                           position=(tempDisplayText.width, Offset + (FontSize * self.position)))
+    # Gives the row new data for the train it is already showing. The card is only made again if what is shown on it has changed, and
+    # where it has scrolled to is kept; so new data does not start the card again.
+    def retimeCard(self, newService):
+        self.CurrentService = newService
+        if self.getCardText(newService) == self.CardText:
+            return
 
-        self.image_composition.add_image(self.IDestintion)
-        self.image_composition.add_image(self.IDisplayTime)
-        self.image_composition.refresh()
+        # The images for the card are only on the display once it has finished opening, the calling at images in place of the
+        # others while they scroll.
+        showing = self.is_showing()
+        calling = self.state == self.SCROLLING_PAUSE or self.state == self.SCROLLING
+        if showing:
+            self.image_composition.remove_image(self.IDisplayText)
+            self.image_composition.remove_image(self.IDestintion)
+            self.image_composition.remove_image(self.IDisplayTime)
+        if calling:
+            self.image_composition.remove_image(self.ICallingAt)
+            self.image_composition.remove_image(self.SCallingAt)
+        offset = self.ICallingAt.offset
+        self.generateCard(newService)
+        self.ICallingAt.offset = offset
+        if showing:
+            self.image_composition.add_image(self.IDisplayText)
+            self.image_composition.add_image(self.IDestintion)
+            self.image_composition.add_image(self.IDisplayTime)
+        if calling:
+            self.image_composition.add_image(self.ICallingAt)
+            self.image_composition.add_image(self.SCallingAt)
+        if showing or calling:
+            self.image_composition.refresh()
 
     # Called when you want to change the row from one service to another.
     def changeCard(self, newService, device):
@@ -633,13 +1223,8 @@ class ScrollTime():
         #Update X min till arrival.
         if self.CurrentService.TimePassedStatic() and (
                 self.state == self.SCROLL_DECIDER or self.state == self.SCROLLING_WAIT or self.state == self.SCROLLING or self.state == self.WAIT_SYNC):
-            self.image_composition.remove_image(self.IDisplayTime)
             self.CurrentService.DisplayTime = self.CurrentService.GetExptTime()
-            displayTimeTemp = TextImage(device, self.CurrentService.DisplayTime)
-            self.IDisplayTime = ComposableImage(displayTimeTemp.image, position=(
-            device.width - displayTimeTemp.width, Offset + (FontSize * self.position)))
-            self.image_composition.add_image(self.IDisplayTime)
-            self.image_composition.refresh()
+            self.retimeCard(self.CurrentService)
 
         if self.state == self.WAIT_OPENING:
             if not self.is_waiting():
@@ -760,6 +1345,11 @@ class ScrollTime():
     def addPartner(self, partner):
         self.partner = partner
 
+    # Returns true or false dependent upon if the card's images are on the display, they are from when it finishes opening until it is changed;
+    # apart from while the calling at message is scrolling.
+    def is_showing(self):
+        return self.state == self.SCROLL_DECIDER or self.state == self.SCROLLING_WAIT or self.state == self.WAIT_SYNC
+
     # Used to add a time delay between animations.
     def is_waiting(self):
         self.ticks += 1
@@ -775,14 +1365,22 @@ class ScrollTime():
 ###
 class boardFixed():
     def __init__(self, image_composition, scroll_delay, device):
-        self.Services = LiveTime.GetData()
+        # The board is made from the data already got in the background, if there is any, so the display never waits on the network. If
+        # there is none yet it shows that there are no services while new data is got, and is made again once it arrives; see is_waiting.
+        self.Services = Fetcher.take() or ()
+        if LiveTime.TimePassed():
+            Fetcher.prefetch()
         self.synchroniser = Synchroniser()
         self.scroll_delay = scroll_delay
         self.image_composition = image_composition
         self.device = device
         self.ticks = 0
+        # The images made for each train shown, so they can be used again the next time it is shown; see ScrollTime.generateCard.
+        self.CardImages = {}
         self.setInitalCards()
         self.State = "alive"
+        # True while waiting on new data got after the network connection came back, to be shown as soon as it arrives.
+        self.Refreshing = False
 
         NoServiceTemp = NoService(device)
         self.NoServices = ComposableImage(NoServiceTemp.image, position=(
@@ -829,9 +1427,28 @@ class boardFixed():
         # If it has cycled through all cards, cycle from start again, unless enough time has passed for a new API request.
         if (self.x > Args.NumberOfCards or self.x > len(self.Services) - 1):
             self.x = 1 if Args.FixToArrive else 0
-            if LiveTime.TimePassed():
-                self.Services = LiveTime.GetData()
-                print_safe("New Data Retrieved %s" % datetime.now().time())
+            # Swap in the new data retrieved in the background, if there is any.
+            NewServices = Fetcher.take()
+            if NewServices != None:
+                Changes = self.updateServices(NewServices, False)
+                self.Refreshing = False
+                print_safe("New Data Retrieved %s - %s" % (datetime.now().time(), Changes))
+
+        # Once the network connection comes back start getting new data straight away, and show it as soon as it arrives rather than at the end of the cycle.
+        if Network.Refresh and LiveTime.TimePassed():
+            Network.Refresh = False
+            self.Refreshing = True
+            Fetcher.prefetch()
+        elif self.Refreshing:
+            NewServices = Fetcher.take()
+            if NewServices != None:
+                Changes = self.updateServices(NewServices, True)
+                self.Refreshing = False
+                print_safe("New Data Retrieved %s - %s" % (datetime.now().time(), Changes))
+
+        # Start getting new data shortly before the end of the cycle, so it is ready for when the cycle wraps round.
+        if LiveTime.TimePassed() and self.x >= min(Args.NumberOfCards, len(self.Services) - 1) - DataFetcher.PREFETCH_CARDS:
+            Fetcher.prefetch()
 
         # If there are more rows (3) than there is services scheduled show nothing.
         if row > len(self.Services):
@@ -860,10 +1477,42 @@ class boardFixed():
         if not (Args.FixToArrive and row == 1):
             self.x = self.x + 1
 
-    # Used to add a time delay if there was an error with the last API request (providing a back off and wait mechanism)
+    # Swaps in new data for the board, working out what has changed since the last data rather than starting again. Rows showing a train
+    # which is still coming are given its new data straight away, only making the card again if what is shown on it has changed; the images
+    # kept for trains which have gone are thrown away; and if 'keepPlace' the cycle carries on from the train which was going to be
+    # shown next, wherever it now is. Returns a summary of what changed.
+    def updateServices(self, NewServices, keepPlace):
+        OldIDs = [service.ID for service in self.Services]
+        OldTimes = {service.ID: service.ExptArrival for service in self.Services}
+        NewIDs = {}
+        NewTimes = {}
+        for index, service in enumerate(NewServices):
+            NewIDs.setdefault(service.ID, index)
+            NewTimes.setdefault(service.ID, service.ExptArrival)
+
+        if keepPlace and len(OldIDs) > 0 and OldIDs[self.x % len(OldIDs)] in NewIDs:
+            self.x = max(1 if Args.FixToArrive else 0, NewIDs[OldIDs[self.x % len(OldIDs)]])
+
+        for row in (self.top, self.middel, self.bottom):
+            if row.CurrentService.ID in NewIDs:
+                row.retimeCard(NewServices[NewIDs[row.CurrentService.ID]])
+
+        self.CardImages = {ID: images for ID, images in self.CardImages.items() if ID in NewIDs}
+        self.Services = NewServices
+
+        kept = [ID for ID in dict.fromkeys(OldIDs) if ID in NewIDs]
+        retimed = len([ID for ID in kept if OldTimes[ID] != NewTimes[ID]])
+        reordered = kept != sorted(kept, key=NewIDs.get)
+        return "%d added, %d removed, %d re-timed%s" % (len(NewIDs) - len(kept), len(set(OldIDs)) - len(kept), retimed, ", reordered" if reordered else "")
+
+    # Used to add a time delay if there was an error with the last API request or there were no services, until the time picked for the next
+    # API data call; which backs off after failures in a row (providing a back off and wait mechanism). The new data is got in the background
+    # so the display keeps running, and the wait is over once it has been got.
     def is_waiting(self):
         self.ticks += 1
-        if self.ticks > Args.RecoveryTime:
+        if LiveTime.TimePassed():
+            Fetcher.prefetch()
+        if Fetcher.has_new():
             self.ticks = 0
             return False
         return True
@@ -916,6 +1565,9 @@ if Args.Display == 'gifanim':
     device._max_frames = int(Args.maxframes)
 
 image_composition = ImageComposition(device)
+Fetcher = DataFetcher()
+if not Args.IgnoreNetwork:
+    Network.start()
 board = boardFixed(image_composition, Args.Delay, device)
 FontTime = ImageFont.truetype(
     "%s/resources/time.otf" % (os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))), TimeSize)
@@ -0,0 +1,194 @@
+# This software was produced by Jonathan Foot (c) 2024, all rights reserved.
+# Project Website : https://departureboard.jonathanfoot.com
+# Documentation   : https://jonathanfoot.com/Projects/DepartureBoard
+# Description     : This program is a caching proxy for a group of departure boards on the same network. Boards showing the same stop or
+#                   station share one request to the API, instead of every board asking for the same data. Start the boards with '--Proxy'.
+# Python 3 Required.
+
+import time
+import hashlib
+import threading
+import argparse
+from urllib.request import urlopen, Request
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from datetime import datetime
+
+###
+# Below Declares all the program optional and compulsory settings/ start up paramters.
+###
+## Start Up Paramarter Checks
+# Checks value is greater than Zero.
+def check_positive(value):
+	try:
+		ivalue = int(value)
+		if ivalue <= 0:
+			raise argparse.ArgumentTypeError("%s is invalid, value must be an integer value greater than 0." % value)
+		return ivalue
+	except:
+		raise argparse.ArgumentTypeError("%s is invalid, value must be an integer value greater than 0." % value)
+
+## Defines all optional paramaters
+parser = argparse.ArgumentParser(description='Departure Board Proxy, shares requests to the APIs between all of the departure boards on your network. Start each board with "--Proxy http://[this Pi\'s address]:[Port]" to use it.')
+parser.add_argument("-p","--Port", help="The port the proxy listens for boards on; default is 8080.", type=check_positive,default=8080)
+parser.add_argument("--Host", default="0.0.0.0", help="The address the proxy listens for boards on; default is '0.0.0.0', ie every network the Pi is connected to.")
+parser.add_argument("-l","--TTL", help="How long a response from an API is reused for before asking the API again; default is 30(seconds), this should be lower than the 'RequestLimit' of your boards.", type=check_positive,default=30)
+parser.add_argument("--Timeout", help="How long the proxy will wait on an API before giving up; default is 20(seconds).", type=check_positive,default=20)
+parser.add_argument("--no-console-output",dest='NoConsole', action='store_true', help="Used to stop the program outputting anything to console that isn't an error message, you might want to do this if your logging the program output into a file to record crashes.")
+Args = parser.parse_args()
+
+## Defines all the programs "global" variables
+# The APIs used by the boards, the proxy will not pass on requests to anywhere else.
+AllowedHosts = ["reading-opendata.r2p.com", "transportapi.com", "api.tfl.gov.uk", "api.vertrektijd.info", "lite.realtime.nationalrail.co.uk"]
+# The headers from a board which are passed on to the API, as they can change the response it sends back.
+ForwardedHeaders = ["Accept", "Accept-Version", "X-Vertrektijd-Client-Api-Key", "User-Agent", "Content-Type", "SOAPAction"]
+
+
+###
+## Response Cache
+## Keeps each response from an API for 'TTL' seconds. If several boards ask for the same thing at once only one request is made to the
+## API and every board is given its response.
+###
+class CachedResponse():
+	def __init__(self, status, contentType, body):
+		self.status = status
+		self.contentType = contentType
+		self.body = body
+		# Lets a board with this response already skip downloading it again.
+		self.etag = '"%s"' % hashlib.sha1(body).hexdigest()
+		self.expires = time.monotonic() + Args.TTL
+
+# A request to an API which is in progress, any other board asking for the same thing waits for its result.
+class PendingRequest():
+	def __init__(self):
+		self.done = threading.Event()
+		self.response = None
+		self.error = None
+
+class ResponseCache():
+	def __init__(self):
+		self.lock = threading.Lock()
+		# Responses retrieved from the APIs; keyed by request.
+		self.entries = {}
+		# Requests to the APIs in progress; keyed by request.
+		self.pending = {}
+		self.requests = 0
+		self.upstream = 0
+
+	# Returns the response to a request, reusing a recent one if there is one. Otherwise calls fetch to ask the API, unless another board
+	# is already waiting on the same request, in which case its response is used instead.
+	def get(self, key, fetch):
+		with self.lock:
+			self.requests += 1
+			entry = self.entries.get(key)
+			if entry != None and entry.expires > time.monotonic():
+				return entry
+			pending = self.pending.get(key)
+			waiting = pending != None
+			if not waiting:
+				pending = self.pending[key] = PendingRequest()
+
+		if waiting:
+			if not pending.done.wait(Args.Timeout * 2):
+				raise TimeoutError("Timed out waiting on another request to the API")
+		else:
+			try:
+				pending.response = fetch()
+			except Exception as e:
+				pending.error = e
+			with self.lock:
+				self.upstream += 1
+				del self.pending[key]
+				# Only keep responses which were successful, so a failed request is retried by the next board.
+				if pending.response != None and pending.response.status < 400:
+					self.entries = {k: v for k, v in self.entries.items() if v.expires > time.monotonic()}
+					self.entries[key] = pending.response
+			pending.done.set()
+			print_safe("API Request Made %s - %s" % (datetime.now().time(), self.stats()))
+
+		if pending.error != None:
+			raise pending.error
+		return pending.response
+
+	# Returns a summary of how many requests the boards have made and how many of those needed a request to an API.
+	def stats(self):
+		with self.lock:
+			return "requests from boards: %d, requests to APIs: %d (%d%% shared)" % (self.requests, self.upstream, 100 - 100 * self.upstream / max(1, self.requests))
+
+Cache = ResponseCache()
+
+# Makes a request to an API, returning the response even if it is an error so the board can handle it as it normally would.
+def Fetch(url, headers, body):
+	try:
+		with urlopen(Request(url, data=body, headers=headers), timeout=Args.Timeout) as response:
+			return CachedResponse(response.status, response.headers.get("Content-Type"), response.read())
+	except HTTPError as e:
+		return CachedResponse(e.code, e.headers.get("Content-Type"), e.read())
+
+
+###
+## Proxy Server
+## A board sends its request to "http://[proxy]/[the URL it wants]", such as "http://192.168.1.10:8080/https://api.tfl.gov.uk/...".
+###
+class ProxyHandler(BaseHTTPRequestHandler):
+	# Lets the boards keep their connection open between requests.
+	protocol_version = "HTTP/1.1"
+
+	def do_GET(self):
+		self.proxy(None)
+
+	# Used by the National Rail board, which sends SOAP requests.
+	def do_POST(self):
+		self.proxy(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+
+	def proxy(self, body):
+		url = self.path[1:]
+		parts = urlsplit(url)
+		if parts.scheme not in ("http", "https") or parts.hostname not in AllowedHosts:
+			self.reply(403, "text/plain", b"Only requests to the departure board APIs can be made through this proxy.")
+			return
+
+		headers = {name: self.headers[name] for name in ForwardedHeaders if self.headers[name] != None}
+		key = (self.command, url, hashlib.sha1(body or b"").hexdigest(), tuple(sorted(headers.items())))
+		try:
+			response = Cache.get(key, lambda: Fetch(url, headers, body))
+		except Exception as e:
+			print("proxy() ERROR")
+			print(str(e))
+			self.reply(502, "text/plain", str(e).encode())
+			return
+
+		# If the board already has this response, tell it nothing has changed instead of sending it all again.
+		if response.status == 200 and self.headers.get("If-None-Match") == response.etag:
+			self.reply(304, None, b"", response.etag)
+		else:
+			self.reply(response.status, response.contentType, response.body, response.etag)
+
+	def reply(self, status, contentType, body, etag=None):
+		self.send_response(status)
+		if contentType != None:
+			self.send_header("Content-Type", contentType)
+		if etag != None:
+			self.send_header("ETag", etag)
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	# Only log requests from boards if allowed to output to console.
+	def log_message(self, format, *args):
+		if not Args.NoConsole:
+			super().log_message(format, *args)
+
+
+# Checks that the user has allowed outputting to console.
+def print_safe(msg):
+	if not Args.NoConsole:
+		print(msg)
+
+try:
+	server = ThreadingHTTPServer((Args.Host, Args.Port), ProxyHandler)
+	print_safe("Departure Board Proxy listening on %s:%d" % (Args.Host, Args.Port))
+	server.serve_forever()
+except KeyboardInterrupt:
+	pass
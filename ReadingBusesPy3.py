@@ -8,13 +8,24 @@ import time
 import inspect,os
 import sys
 import argparse
+import io
 import json
-from urllib.request import urlopen
+import re
+import sqlite3
+import threading
+import random
+import hashlib
+import zlib
+import socket
+import ssl
+import http.client
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
 from PIL import ImageFont, Image, ImageDraw
 from luma.core.render import canvas
 from luma.core import cmdline
-from lxml import objectify
-from datetime import datetime
+from lxml import etree
+from datetime import datetime, timedelta
 from luma.core.image_composition import ImageComposition, ComposableImage
 
 ###
@@ -45,10 +56,15 @@ parser = argparse.ArgumentParser(description='Reading Buses Live Departure Board
 parser.add_argument("-t","--TimeFormat", help="Do you wish to use 24hr or 12hr time format; default is 24hr.", type=int,choices=[12,24],default=24)
 parser.add_argument("-v","--Speed", help="What speed do you want the text to scroll at on the display; default is 3, must be greater than 0.", type=check_positive,default=3)
 parser.add_argument("-d","--Delay", help="How long the display will pause before starting the next animation; default is 30, must be greater than 0.", type=check_positive,default=30)
-parser.add_argument("-r","--RecoveryTime", help="How long the display will wait before attempting to get new data again after previously failing; default is 100, must be greater than 0.", type=check_positive,default=100)
+parser.add_argument("-r","--RecoveryTime", help="How long, in seconds, the display will wait before attempting to get new data again after previously failing. This doubles after each failure in a row, up to the 'MaxRecoveryTime'; default is 10, must be greater than 0.", type=check_positive,default=10)
+parser.add_argument("--RefreshDeadline", help="The longest time, in seconds, one refresh of the data can take; including the main request and any look ups which follow it, such as for Via messages. Anything not retrieved in time is left out until the next refresh; default is 30.", type=check_positive,default=30)
+parser.add_argument("--StaleLimit", help="If new data can not be retrieved, how long, in seconds, the display will keep showing the last data it got; counting down the times from when each service was expected and leaving off any which have already left. After this nothing is shown until new data is retrieved; default is 600.", type=check_positive,default=600)
+parser.add_argument("--MaxRecoveryTime", help="The longest time, in seconds, the display will wait before attempting to get new data again after failing many times in a row; default is 600, must be greater than 0.", type=check_positive,default=600)
 parser.add_argument("-n","--NumberOfCards", help="The maximum number of cards you will see before forcing a new data retrieval, a limit is recommend to prevent cycling through data which may become out of data or going too far into scheduled buses; default is 9, must be greater than 0.", type=check_positive,default=9)
 parser.add_argument("-y","--Rotation", help="Defines which way up the screen is rendered; default is 0", type=int,default=0,choices=[0,2])
 parser.add_argument("-l","--RequestLimit", help="Defines the minium amount of time the display must wait before making a new data request; default is 55(seconds)", type=check_positive,default=55)
+parser.add_argument("--MaxRequestLimit", help="Defines the maximum amount of time the display will wait before making a new data request. The display requests new data more often the sooner the next service is due, down to the 'RequestLimit', and waits this long when there are no services at all; default is 900(seconds)", type=check_positive,default=900)
+parser.add_argument("--FixedRequestLimit", dest='FixedRequestLimit', action='store_true', help="Always make a new data request every 'RequestLimit' seconds, instead of changing how often based upon how soon the next service is due.")
 parser.add_argument("-z","--StaticUpdateLimit", help="Defines the amount of time the display will wait before updating the expected arrival time (based upon it's last known predicted arrival time); default is  15(seconds), this should be lower than your 'RequestLimit'", type=check_positive,default=15)
 parser.add_argument("-e","--EnergySaverMode", help="To save screen from burn in and prolong it's life it is recommend to have energy saving mode enabled. 'off' is default, between the hours set the screen will turn off. 'dim' will turn the screen brightness down, but not completely off. 'none' will do nothing and leave the screen on; this is not recommend, you can change your active hours instead.", type=str,choices=["none","dim","off"],default="off")
 parser.add_argument("-i","--InactiveHours", help="The period of time for which the display will go into 'Energy Saving Mode' if turned on; default is '23:00-07:00'", type=check_time,default="23:00-07:00")
@@ -58,9 +74,15 @@ parser.add_argument("-m","--ViaMessageMode", choices=["full", "reduced", "fixed"
 parser.add_argument("-c","--ReducedValue", type=check_positive, default=2, help="If you are using a 'reduced' via message this value is for every n suburbs visited report it in the via; default is 2 ie every other suburb visited report.")
 parser.add_argument("-f","--FixedLocations",type=check_positive, default=3, help="If you are using 'fixed' via message this value will limit the max number of via destinations. Taking F locations evenly between a route.")
 parser.add_argument('--ShowIndex', dest='ShowIndex', action='store_true',help="Do you wish to see index position for each service due to arrive.")
+parser.add_argument("--StopNameTrim", default="", help="Any extra words which, along with anything after them, are removed from stop names in the Via message; as is already done for words like 'Opp' and 'N-Bound'. Make sure to capitalise correctly and simply put a single space between each, e.g. 'Bay Stand'.")
+parser.add_argument("--ViaWorkers", type=check_positive, default=4, help="How many Via messages are got from the API at the same time, when the board starts or a new service arrives at the stop. The services are shown straight away and each Via message is added once it has been got; default is 4.")
+parser.add_argument("--ViaCacheDays", type=check_positive, default=7, help="How many days the stops each service visits are remembered for, in a file, so the Via messages can be made after a restart without asking the API again; default is 7.")
+parser.add_argument("--ClearViaCache", dest='ClearViaCache', action='store_true', help="Forget all of the stops remembered for making the Via messages and get them from the API again, you might want to do this after the timetables have changed.")
 parser.add_argument("--ReducedAnimations", help="If you wish to stop the Via animation and cycle faster through the services use this tag to turn the animation off.", dest='ReducedAnimations', action='store_true')
 parser.add_argument("--UnfixNextToArrive",dest='FixToArrive', action='store_false', help="Keep the bus sonnest to next arrive at the very top of the display until it has left; by default true")
 parser.add_argument('--no-splashscreen', dest='SplashScreen', action='store_false',help="Do you wish to see the splash screen at start up; recommended and on by default.")
+parser.add_argument("--IgnoreNetwork", dest="IgnoreNetwork", action="store_true", help="Used to keep making requests even when the Pi does not appear to be connected to a network. By default no requests are made while there is no connection and new data is got as soon as it comes back.")
+parser.add_argument("--Proxy", default=None, help="The address of a Departure Board Proxy (ProxyPy3.py) on your network, such as 'http://192.168.1.10:8080'. Requests to the API are sent through it, so boards showing the same stop share them; by default the API is used directly.")
 parser.add_argument("--Display", default="ssd1322", choices=['ssd1322','pygame','capture','gifanim'], help="Used for development purposes, allows you to switch from a physical display to a virtual emulated one; default 'ssd1322'")
 parser.add_argument("--max-frames", default=60,dest='maxframes', type=check_positive, help="Used only when using gifanim emulator, sets how long the gif should be.")
 parser.add_argument("--no-console-output",dest='NoConsole', action='store_true', help="Used to stop the program outputting anything to console that isn't an error message, you might want to do this if your logging the program output into a file to record crashes.")
@@ -84,6 +106,547 @@ BasicFont = ImageFont.truetype("%s/resources/lower.ttf" %(os.path.dirname(os.pat
 Vias = {"0":"Via Central Reading"}
 
 
+###
+## HTTP Client
+## Keeps connections to each API server open between requests, so a new request does not have to look up the server's address,
+## connect and redo the TLS handshake every time; on a Pi Zero the handshake alone costs more than reading the response.
+###
+# The result of a request made using the HTTPClient.
+class APIResponse():
+	def __init__(self, status, headers, body, unchanged=False, url=None, validator=None):
+		self.status = status
+		self.headers = headers
+		self.body = body
+		# True if the server returned exactly the same data as the last time this URL was requested.
+		self.unchanged = unchanged
+		# The ETag, Last-Modified date and hash of the response, only remembered for the URL once the data has been used, see HTTPClient.commit.
+		self.url = url
+		self.validator = validator
+
+# Limits how long one refresh of the data can take in total, including the main request and every look up which follows it.
+# It can also be cancelled, after which it acts as if it has run out of time.
+class Deadline():
+	def __init__(self, seconds):
+		self.expires = time.monotonic() + seconds
+		self.cancelled = False
+
+	def Cancel(self):
+		self.cancelled = True
+
+	# Returns how many seconds are left before the deadline.
+	def Remaining(self):
+		return 0 if self.cancelled else max(0, self.expires - time.monotonic())
+
+	def Expired(self):
+		return self.Remaining() <= 0
+
+# Raised when a request is stopped because its deadline has passed.
+class DeadlineExceeded(TimeoutError):
+	pass
+
+# A connection which connects using the addresses already looked up by the HTTPClient, instead of looking them up itself.
+class PooledHTTPConnection(http.client.HTTPConnection):
+	def __init__(self, host, port, client, timeout):
+		super().__init__(host, port, timeout=timeout)
+		self.client = client
+
+	def connect(self):
+		self.sock = self.client.connect(self.host, self.port, self.timeout)
+
+class PooledHTTPSConnection(http.client.HTTPSConnection):
+	def __init__(self, host, port, client, timeout, context):
+		super().__init__(host, port, timeout=timeout, context=context)
+		self.client = client
+		self.sslContext = context
+
+	def connect(self):
+		sock = self.client.connect(self.host, self.port, self.timeout)
+		self.sock = self.sslContext.wrap_socket(sock, server_hostname=self.host)
+
+class HTTPClient():
+	# How long to remember a server's address before looking it up again, in seconds.
+	DNS_TTL = 300
+	# How long to wait on a server before giving up on a request, in seconds.
+	TIMEOUT = 20
+	# How many URLs to remember the last response of, for making conditional requests.
+	MAX_VALIDATORS = 64
+	# How much of a compressed response to read and decompress at a time, in bytes.
+	CHUNK_SIZE = 16384
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.context = ssl.create_default_context()
+		# Connections not currently being used, ready to be used again; keyed by (scheme, host, port).
+		self.idle = {}
+		# Server addresses already looked up, as a list of (family, address), and when they expire; keyed by (host, port).
+		self.addresses = {}
+		# The ETag, Last-Modified date and hash of the last response used from each URL; keyed by URL.
+		self.validators = {}
+		# The number of bytes received from each server and how many that was once decompressed; keyed by host.
+		self.traffic = {}
+		self.requests = 0
+		self.reused = 0
+		self.opened = 0
+
+	# Makes a GET request, returning an APIResponse. Raises an exception if the request fails or the server returns an error.
+	# If a deadline is given the request is stopped, raising DeadlineExceeded, if it has not finished by then.
+	# If conditional, the server is asked to only send the data if it has changed, and the response is marked as unchanged
+	# if the server says it hasn't (304 Not Modified) or it sends exactly the same data as last time anyway. What is compared against is
+	# the last response passed to commit.
+	def get(self, url, headers={}, timeout=None, conditional=False, deadline=None):
+		timeout = timeout or HTTPClient.TIMEOUT
+		# Send the request through the proxy, if using one; the proxy passes it on to the API.
+		if Args.Proxy != None:
+			url = "%s/%s" % (Args.Proxy.rstrip("/"), url)
+		if deadline != None:
+			if deadline.Expired():
+				raise DeadlineExceeded("No time left to request %s" % urlsplit(url).hostname)
+			timeout = min(timeout, deadline.Remaining())
+		headers = dict(headers)
+		headers.setdefault("Accept-Encoding", "gzip, deflate")
+		with self.lock:
+			validator = self.validators.get(url)
+		if conditional and validator != None:
+			if validator[0] != None:
+				headers["If-None-Match"] = validator[0]
+			if validator[1] != None:
+				headers["If-Modified-Since"] = validator[1]
+		parts = urlsplit(url)
+		key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+		path = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+
+		conn, reused = self.take(key, timeout)
+		while True:
+			try:
+				conn.request("GET", path, headers=headers)
+				response = conn.getresponse()
+				body, received = self.read(response, conn, deadline)
+				break
+			except DeadlineExceeded:
+				conn.close()
+				raise
+			except (http.client.HTTPException, OSError) as e:
+				conn.close()
+				# A request cut short by its deadline times out, or fails if the deadline was cancelled.
+				if deadline != None and deadline.Expired():
+					raise DeadlineExceeded("Ran out of time requesting %s" % parts.hostname)
+				# The server may have closed a connection that was left open, if so try again once on a brand new connection.
+				# A server which is too slow to answer would just be as slow again, so that is not retried.
+				if not reused or isinstance(e, socket.timeout):
+					raise
+				if deadline != None:
+					if deadline.Expired():
+						raise DeadlineExceeded("Ran out of time requesting %s" % parts.hostname)
+					timeout = min(timeout, deadline.Remaining())
+				conn, reused = self.open(key, timeout), False
+
+		with self.lock:
+			self.requests += 1
+			self.reused += 1 if reused else 0
+			traffic = self.traffic.setdefault(parts.hostname, [0, 0])
+			traffic[0] += received
+			traffic[1] += len(body)
+		if response.will_close:
+			conn.close()
+		else:
+			self.release(key, conn)
+
+		if response.status >= 400:
+			raise http.client.HTTPException("HTTP Error %d: %s" % (response.status, response.reason))
+		# Redirects are not followed; the body is not the data asked for, so it must not be used or remembered as the last response.
+		if response.status >= 300 and response.status != 304:
+			raise http.client.HTTPException("HTTP Redirect %d: %s to %s, which is not followed" % (response.status, response.reason, response.getheader("Location")))
+		if response.status == 304:
+			return APIResponse(response.status, response.headers, body, conditional and validator != None)
+
+		digest = hashlib.sha1(body).digest()
+		return APIResponse(response.status, response.headers, body, conditional and validator != None and validator[2] == digest,
+			url, (response.getheader("ETag"), response.getheader("Last-Modified"), digest))
+
+	# Remembers a response as the last one from its URL, for making conditional requests. Only called once its data has been read
+	# successfully; otherwise the same broken data sent again would be taken as unchanged, and never read again.
+	def commit(self, response):
+		if response.validator == None:
+			return
+		with self.lock:
+			self.validators.pop(response.url, None)
+			self.validators[response.url] = response.validator
+			# Forget the oldest URL once too many are remembered.
+			if len(self.validators) > HTTPClient.MAX_VALIDATORS:
+				self.validators.pop(next(iter(self.validators)))
+
+	# Reads the body of a response, decompressing it as it arrives if the server compressed it. Also returns the number of bytes actually received.
+	# The body is read a piece at a time so the deadline, if there is one, can be checked between each piece.
+	def read(self, response, conn, deadline):
+		encoding = (response.getheader("Content-Encoding") or "").strip().lower()
+		decompressor = None
+		chunks = []
+		received = 0
+		while True:
+			if deadline != None:
+				if deadline.Expired():
+					raise DeadlineExceeded("Ran out of time reading the response from %s" % conn.host)
+				if conn.sock != None:
+					conn.sock.settimeout(min(conn.timeout, deadline.Remaining()))
+			# Unlike read1, read marks the response as finished once all of it has been read, without which the connection can not be reused.
+			chunk = response.read(HTTPClient.CHUNK_SIZE)
+			if not chunk:
+				break
+			received += len(chunk)
+			if encoding not in ("gzip", "deflate"):
+				chunks.append(chunk)
+				continue
+			if decompressor == None:
+				# Some servers send raw deflate data without the zlib header it is meant to have.
+				if encoding == "gzip":
+					decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+				else:
+					decompressor = zlib.decompressobj(zlib.MAX_WBITS if chunk[0] & 0x0F == 8 else -zlib.MAX_WBITS)
+			chunks.append(decompressor.decompress(chunk))
+		if decompressor != None:
+			chunks.append(decompressor.flush())
+		# A response with no body, such as 304 Not Modified, is not marked as finished by reading it; so it is closed here to be sure.
+		response.close()
+		return b"".join(chunks), received
+
+	# Returns an idle connection to the server if there is one, otherwise opens a new one. Also returns if the connection is being reused.
+	def take(self, key, timeout):
+		with self.lock:
+			if len(self.idle.get(key, [])) > 0:
+				conn = self.idle[key].pop()
+				conn.timeout = timeout
+				if conn.sock != None:
+					conn.sock.settimeout(timeout)
+				return conn, True
+		return self.open(key, timeout), False
+
+	# Puts a connection back, ready for the next request to the same server.
+	def release(self, key, conn):
+		with self.lock:
+			self.idle.setdefault(key, []).append(conn)
+
+	def open(self, key, timeout):
+		scheme, host, port = key
+		with self.lock:
+			self.opened += 1
+		if scheme == "https":
+			return PooledHTTPSConnection(host, port, self, timeout, self.context)
+		return PooledHTTPConnection(host, port, self, timeout)
+
+	# Opens a socket to a server, trying each of its addresses in turn until one connects, all within the timeout. If an address can not
+	# be connected to, the addresses are looked up again for the next connection as the server may have moved.
+	def connect(self, host, port, timeout):
+		end = time.monotonic() + timeout
+		error = None
+		for family, address in self.resolve(host, port, timeout):
+			if end - time.monotonic() <= 0:
+				raise socket.timeout("Timed out connecting to %s" % host)
+			sock = socket.socket(family, socket.SOCK_STREAM)
+			try:
+				sock.settimeout(end - time.monotonic())
+				sock.connect(address)
+				return sock
+			except OSError as e:
+				sock.close()
+				error = e
+				with self.lock:
+					self.addresses.pop((host, port), None)
+		raise error
+
+	# Looks up the addresses of a server, remembering them for a short while so they do not need to be looked up on every new connection.
+	def resolve(self, host, port, timeout):
+		with self.lock:
+			if (host, port) in self.addresses and self.addresses[(host, port)][1] > time.monotonic():
+				return self.addresses[(host, port)][0]
+		addresses = self.lookup(host, port, timeout)
+		with self.lock:
+			self.addresses[(host, port)] = (addresses, time.monotonic() + HTTPClient.DNS_TTL)
+		return addresses
+
+	# The system can take a long time to look up an address, and can not be told how long to wait; so it is looked up on another thread
+	# which is only waited on for the timeout, keeping the request within its deadline.
+	def lookup(self, host, port, timeout):
+		result = []
+		def getaddrinfo():
+			try:
+				result.append(socket.getaddrinfo(host, port, type=socket.SOCK_STREAM))
+			except Exception as e:
+				result.append(e)
+		thread = threading.Thread(target=getaddrinfo, name="lookup", daemon=True)
+		thread.start()
+		thread.join(timeout)
+		if len(result) == 0:
+			raise socket.timeout("Timed out looking up %s" % host)
+		if isinstance(result[0], Exception):
+			raise result[0]
+		addresses = list(dict.fromkeys((family, address) for family, _, _, _, address in result[0]))
+		if len(addresses) == 0:
+			raise socket.gaierror("No addresses found for %s" % host)
+		return addresses
+
+	# Closes the connections not being used and forgets the server addresses looked up, used when the network connection has changed
+	# as they may no longer work.
+	def reset(self):
+		with self.lock:
+			for conns in self.idle.values():
+				for conn in conns:
+					conn.close()
+			self.idle = {}
+			self.addresses = {}
+
+	# Returns a summary of how many requests have been made, how many were able to reuse an open connection and how much data was received from each server.
+	def stats(self):
+		with self.lock:
+			summary = "HTTP requests: %d, reused connections: %d (%d%%), new connections: %d" % (self.requests, self.reused, 100 * self.reused / max(1, self.requests), self.opened)
+			for host, (received, decoded) in self.traffic.items():
+				summary += ", %s: %.1fkB received (%.1fkB uncompressed, %d%% saved)" % (host, received / 1024, decoded / 1024, 100 - 100 * received / max(1, decoded))
+			return summary
+
+Client = HTTPClient()
+
+
+###
+## Circuit Breaker
+## Keeps track of whether an API endpoint is working. After a failure no more requests are made to it for a while, this wait doubles
+## after each failure in a row up to the 'MaxRecoveryTime', with a random amount taken off so many displays do not all retry at the same time.
+## The first request to succeed resets it, so an endpoint which has recovered is used again straight away.
+###
+class CircuitBreaker():
+	def __init__(self, name):
+		self.name = name
+		self.lock = threading.Lock()
+		# The number of failures in a row.
+		self.failures = 0
+		# No requests should be made to the endpoint before this time.
+		self.RetryAt = datetime.now()
+
+	# Returns true or false dependent upon if a request can be made to the endpoint.
+	def Allow(self):
+		with self.lock:
+			return datetime.now() >= self.RetryAt
+
+	def Success(self):
+		with self.lock:
+			if self.failures > 0:
+				print_safe("%s recovered after %d failures" % (self.name, self.failures))
+			self.failures = 0
+
+	# Lets a request be made straight away, used when the cause of the failures has been fixed.
+	def Reset(self):
+		with self.lock:
+			self.failures = 0
+			self.RetryAt = datetime.now()
+
+	# Records a failure, returning the time at which a request can next be made to the endpoint.
+	def Failure(self):
+		with self.lock:
+			self.failures += 1
+			delay = min(Args.MaxRecoveryTime, Args.RecoveryTime * 2 ** min(self.failures - 1, 16))
+			delay = random.uniform(delay / 2, delay)
+			self.RetryAt = datetime.now() + timedelta(seconds=delay)
+			print_safe("%s failed %d time(s) in a row, waiting %ds before trying again" % (self.name, self.failures, delay))
+			return self.RetryAt
+
+FeedBreaker = CircuitBreaker("siri-sm")
+LinePatternBreaker = CircuitBreaker("line-patterns")
+
+
+###
+## Network Monitor
+## Watches whether the Pi is connected to a network, by checking it has a default route through an interface which is plugged in or
+## connected to Wi-Fi. While it is not no requests are made, as they could only fail after waiting to connect; once the connection comes
+## back new data is got straight away, instead of waiting out the time picked for the next request or the back off after the failures.
+###
+class NetworkMonitor():
+	# How often to check the connection, in seconds.
+	INTERVAL = 1
+	ROUTES = "/proc/net/route"
+	IPV6_ROUTES = "/proc/net/ipv6_route"
+	# Route flags, see linux/route.h.
+	RTF_UP = 0x0001
+	RTF_REJECT = 0x0200
+
+	def __init__(self, breakers):
+		self.breakers = breakers
+		self.Online = True
+		# Set when the connection comes back, until the board has started getting new data.
+		self.Refresh = False
+
+	# Starts checking the connection in the background.
+	def start(self):
+		self.Online = NetworkMonitor.Connected()
+		threading.Thread(target=self.run, daemon=True).start()
+
+	def run(self):
+		while True:
+			time.sleep(NetworkMonitor.INTERVAL)
+			online = NetworkMonitor.Connected()
+			if online == self.Online:
+				continue
+			self.Online = online
+			if online:
+				print_safe("Network connection restored %s, getting new data" % datetime.now().time())
+				self.Reconnected()
+			else:
+				print_safe("Network connection lost %s, showing the last data retrieved until it comes back" % datetime.now().time())
+				# Stop any request in progress, it can not finish now.
+				Fetcher.cancel()
+
+	# Forgets the failures made while there was no connection and gets new data now.
+	def Reconnected(self):
+		for breaker in self.breakers:
+			breaker.Reset()
+		Client.reset()
+		LiveTime.NextUpdate = datetime.now()
+		self.Refresh = True
+
+	# Returns true or false dependent upon if there is a default route which is up, through an interface which has a carrier.
+	# If the routes can not be read, such as when not running on Linux, the connection is assumed to be working.
+	@staticmethod
+	def Connected():
+		try:
+			with open(NetworkMonitor.ROUTES) as routes:
+				next(routes)
+				for route in routes:
+					# Iface, Destination, Gateway, Flags, RefCnt, Use, Metric, Mask...
+					fields = route.split()
+					if fields[1] == "00000000" and fields[7] == "00000000" and int(fields[3], 16) & NetworkMonitor.RTF_UP and NetworkMonitor.Carrier(fields[0]):
+						return True
+		except OSError:
+			return True
+		try:
+			with open(NetworkMonitor.IPV6_ROUTES) as routes:
+				for route in routes:
+					# Destination, Prefix length, Source, Source prefix length, Next hop, Metric, RefCnt, Use, Flags, Iface.
+					fields = route.split()
+					flags = int(fields[8], 16)
+					if fields[1] == "00" and fields[9] != "lo" and flags & NetworkMonitor.RTF_UP and not flags & NetworkMonitor.RTF_REJECT and NetworkMonitor.Carrier(fields[9]):
+						return True
+		except OSError:
+			pass
+		return False
+
+	# Returns true or false dependent upon if the interface is plugged in or connected to Wi-Fi. Interfaces which do not report it, such
+	# as VPNs, are assumed to be connected; the kernel refuses to report it for an interface which is down.
+	@staticmethod
+	def Carrier(interface):
+		try:
+			with open("/sys/class/net/%s/carrier" % interface) as carrier:
+				return carrier.read().strip() == "1"
+		except FileNotFoundError:
+			return True
+		except OSError:
+			return False
+
+Network = NetworkMonitor([FeedBreaker, LinePatternBreaker])
+
+
+###
+## Stop Name Simplifier
+## Stop names in the line patterns often include where the stop is, such as "Broad Street Opp Boots"; only the place is wanted in the Via
+## message. The words to cut at are matched all at once, and each stop is only simplified once as the same stops appear in many lines.
+###
+class StopNameSimplifier():
+	# Anything from the first of these words onwards is removed from a stop name.
+	RULES = ["Opp", "Adj", "Stop", "Adjacent", "Opposite", "N-Bound", "Ne-Bound", "Nw-Bound", "S-Bound", "Se-Bound", "Sw-Bound", "E-Bound", "W-Bound"]
+
+	def __init__(self, extra):
+		self.pattern = re.compile("|".join(re.escape(rule.title()) for rule in StopNameSimplifier.RULES + extra))
+		# Stop names already simplified; keyed by location code.
+		self.names = {}
+
+	def Simplify(self, code, name):
+		simple = self.names.get(code)
+		if simple == None:
+			name = str(name).title()
+			match = self.pattern.search(name)
+			simple = self.names[code] = (name[:match.start()] if match else name).strip()
+		return simple
+
+NameSimplifier = StopNameSimplifier(Args.StopNameTrim.split())
+
+
+###
+## Line Pattern Store
+## Remembers the stops each service visits after a stop in a file, so the Via messages can be made again after a restart without asking
+## the API. Patterns are kept for 'ViaCacheDays' days and only the most recently used MAX_ENTRIES are kept. When a service is found to visit
+## different stops than remembered, such as after the timetables change, everything remembered about it is forgotten.
+###
+class LinePatternStore():
+	FILE = "%s/cache/linepatterns.db" % (os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe()))))
+	# The most patterns to remember, across every stop the board has been used at.
+	MAX_ENTRIES = 256
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.db = None
+		try:
+			os.makedirs(os.path.dirname(LinePatternStore.FILE), exist_ok=True)
+			# Used by both the display and the background data fetcher, the lock makes sure only one uses it at a time.
+			self.db = sqlite3.connect(LinePatternStore.FILE, check_same_thread=False)
+			self.db.execute("CREATE TABLE IF NOT EXISTS patterns (line TEXT, stop TEXT, stops TEXT, fetched REAL, used REAL, PRIMARY KEY (line, stop))")
+			self.db.commit()
+		except Exception as e:
+			print("LinePatternStore() ERROR")
+			print(str(e))
+			self.db = None
+
+	# Returns the stops the service visits after this stop, or None if they are not known or were got more than 'ViaCacheDays' ago; unless expired
+	# is true, which is used when they can not be got from the API.
+	def Get(self, line, expired=False):
+		with self.lock:
+			if self.db == None:
+				return None
+			try:
+				row = self.db.execute("SELECT stops, fetched FROM patterns WHERE line = ? AND stop = ?", (line, Args.StopID)).fetchone()
+				if row == None or (not expired and time.time() - row[1] > Args.ViaCacheDays * 86400):
+					return None
+				self.db.execute("UPDATE patterns SET used = ? WHERE line = ? AND stop = ?", (time.time(), line, Args.StopID))
+				self.db.commit()
+				return json.loads(row[0])
+			except Exception as e:
+				print("LinePatternStore.Get() ERROR")
+				print(str(e))
+				return None
+
+	# Remembers the stops the service visits after this stop, removing the least recently used patterns if there are too many.
+	def Put(self, line, stops):
+		with self.lock:
+			if self.db == None:
+				return
+			try:
+				row = self.db.execute("SELECT stops FROM patterns WHERE line = ? AND stop = ?", (line, Args.StopID)).fetchone()
+				# If the service no longer visits the same stops its timetable has changed, so what is remembered for it at other stops is likely wrong too.
+				if row != None and json.loads(row[0]) != stops:
+					print_safe("Service %s now visits different stops, forgetting the stops remembered for it" % line)
+					self.db.execute("DELETE FROM patterns WHERE line = ?", (line,))
+				self.db.execute("INSERT OR REPLACE INTO patterns VALUES (?, ?, ?, ?, ?)", (line, Args.StopID, json.dumps(stops), time.time(), time.time()))
+				self.db.execute("DELETE FROM patterns WHERE rowid NOT IN (SELECT rowid FROM patterns ORDER BY used DESC LIMIT ?)", (LinePatternStore.MAX_ENTRIES,))
+				self.db.commit()
+			except Exception as e:
+				print("LinePatternStore.Put() ERROR")
+				print(str(e))
+
+	# Forgets the stops remembered for a service, or for every service if none is given. Used when the timetables change.
+	def Invalidate(self, line=None):
+		with self.lock:
+			if self.db == None:
+				return
+			try:
+				if line == None:
+					self.db.execute("DELETE FROM patterns")
+				else:
+					self.db.execute("DELETE FROM patterns WHERE line = ?", (line,))
+				self.db.commit()
+			except Exception as e:
+				print("LinePatternStore.Invalidate() ERROR")
+				print(str(e))
+
+Patterns = LinePatternStore()
+if Args.ClearViaCache:
+	Patterns.Invalidate()
+
+
 ###
 # Below contains the class which is used to reperesent one instance of a service record. It is also responsible for getting the information from the Reading Buses API.
 ###
@@ -106,90 +669,153 @@ class LiveTimeStud():
 class LiveTime(object):
 	# The last time an API call was made to get new data.
 	LastUpdate = datetime.now()
+	# The time at which the next API call should be made.
+	NextUpdate = datetime.now()
+	# How soon the next service must be due, in seconds, before polling as often as the RequestLimit allows.
+	SOON = 5 * 60
+	# The last list of services successfully retrieved, reused if the API returns the same data again.
+	LastServices = None
+	# The last time new data was successfully retrieved from the API.
+	LastGoodUpdate = None
+	# The deadline for the refresh in progress, which every request made as part of it must finish by.
+	CurrentDeadline = None
+	# How long after a service was expected, in seconds, before it is left off when showing old data.
+	DEPARTED = 60
+	# Gets the Via messages in the background, at most 'ViaWorkers' at a time.
+	ViaPool = ThreadPoolExecutor(max_workers=Args.ViaWorkers, thread_name_prefix="via")
+	# The lines whose Via message is being got.
+	ViasPending = set()
+	ViaLock = threading.Lock()
 	
+	# Only these are stored for each service, so the many services made on each refresh are kept small.
+	__slots__ = ("Index", "ServiceNumber", "Destination", "SchArrival", "ExptArrival", "SchClock", "LineRef", "DisplayTime", "ID", "LastStaticUpdate")
+
 	# * Change this method to implement your own API *
 	def __init__(self, Data, Index):
-		self.ServiceNumber = "%s.%s" % (Index + 1, str(Data.LineRef)) if Args.ShowIndex else str(Data.LineRef)
-		self.Destination = str(Data.DestinationName)
-		self.SchArrival = str(Data.MonitoredCall.AimedArrivalTime).split("+")[0]
-		self.ExptArrival = str(getattr( Data.MonitoredCall, "ExpectedArrivalTime", "")).split("+")[0]
-		# The "Via" message, which lists where the service will go through, if unknown use generic message.
-		self.Via = self.GetComplexVia(str(Data.LineRef))
-		# The formated string containing the time of arrival, to be printed on the display screen.
-		self.DisplayTime = self.GetDisplayTime()
-		self.ID =  str(Data.FramedVehicleJourneyRef.DatedVehicleJourneyRef)
+		self.Index = Index
+		self.Destination = Data["DestinationName"]
+		# When the service is scheduled and predicted to arrive, in seconds since the epoch; None if there is no prediction.
+		self.SchArrival = LiveTime.ParseTime(Data["AimedArrivalTime"])
+		self.ExptArrival = LiveTime.ParseTime(Data["ExpectedArrivalTime"]) if Data["ExpectedArrivalTime"] != "" else None
+		self.LineRef = Data["LineRef"]
+		self.ID =  Data["ID"]
+		# What is shown on the card is only worked out once the card is about to be shown, see Materialise.
+		self.DisplayTime = None
+
+	# Works out what is shown on the card for the service, the first time its card is about to be shown. Services the board never gets
+	# round to showing before the next refresh are never worked out.
+	def Materialise(self):
+		if self.DisplayTime == None:
+			self.ServiceNumber = "%s.%s" % (self.Index + 1, self.LineRef) if Args.ShowIndex else self.LineRef
+			self.SchClock = LiveTime.FormatClock(self.SchArrival)
+			# The formated string containing the time of arrival, to be printed on the display screen.
+			self.DisplayTime = self.GetDisplayTime()
+		return self
+
+	# Works out the time to display again, if the service has already been shown.
+	def RefreshDisplayTime(self):
+		if self.DisplayTime != None:
+			self.DisplayTime = self.GetDisplayTime()
 	
+	# The "Via" message, which lists where the service will go through. Blank until it has been got in the background, see WarmVias.
+	@property
+	def Via(self):
+		return "" if Args.ReducedAnimations else Vias.get(self.LineRef, "")
+
 	#Returns the value to display the time on the board.
 	def GetDisplayTime(self):
 		# Last time the display screen was updated to reflect the new time of arrival.
-		self.LastStaticUpdate = datetime.now()
+		self.LastStaticUpdate = time.time()
 		# If unknown predicted time use scheduled (time tabled) time.
-		if self.ExptArrival == "":
-			return " " + datetime.strptime(self.SchArrival, '%Y-%m-%dT%H:%M:%S').strftime("%H:%M" if (Args.TimeFormat==24) else  "%I:%M")
+		if self.ExptArrival == None:
+			return " " + self.SchClock
 		else:
-			Diff =  (datetime.strptime(self.ExptArrival, '%Y-%m-%dT%H:%M:%S') - datetime.now()).total_seconds() / 60
+			Diff =  (self.ExptArrival - self.LastStaticUpdate) / 60
 			if Diff <= 2:
 				return ' Due'
 			# If more than 15min away show the time as 'XX:XX', else show it as a count down in 'X min'
 			if Diff >=15 :
-				return ' ' + datetime.strptime(self.SchArrival, '%Y-%m-%dT%H:%M:%S').strftime("%H:%M" if (Args.TimeFormat==24) else  "%I:%M")
+				return ' ' + self.SchClock
 			return  ' %d min' % Diff
 
-	# Gets a list of stops the bus service is yet to vist from the current stop.
-	def GetServiceLinePatteren(self, ServiceID):
+	# Converts a time given by the API, such as "2024-01-01T10:00:00+01:00", into seconds since the epoch. Done once when the service is made,
+	# so working out how long is left is only a subtraction. Times without a UTC offset are taken to be in local time.
+	@staticmethod
+	def ParseTime(value):
+		return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+	# Returns the local time of day, as shown on the display, of a time in seconds since the epoch.
+	@staticmethod
+	def FormatClock(seconds):
+		return time.strftime("%H:%M" if (Args.TimeFormat==24) else  "%I:%M", time.localtime(seconds))
+
+	# Gets a list of stops the bus service is yet to vist from the current stop, or None if they could not be retrieved by the deadline.
+	@staticmethod
+	def GetServiceLinePatteren(ServiceID, deadline):
+		# Don't make a request if the API has been failing, until it is time to try it again; or if there is no time left.
+		if not LinePatternBreaker.Allow() or deadline.Expired():
+			return None
 		try:
 			StopNames = list()
 			# Request the stops the service vists.
-			with urlopen("https://reading-opendata.r2p.com/api/v1/line-patterns?api_token=%s&line=%s" % (Args.APIKey, ServiceID)) as conn:
-				raw = conn.read()
-				# If HTTP failed.
-				if conn.getcode() != 200:
-					return StopNames
-				
-				stops = json.loads(raw)
-				try:
-					# Found the stop the service is currently at.
-					found = False
-			
-					for stop in stops:
-						#Add to the list all of the stops the service is yet to visit.
-						if found:
-							
-							stopNameSimp = str(stop['location_name']).title() 
-
-							# Removes any extra uneeded info from stop names to simplify them.
-							stopNameSimp = stopNameSimp.split("Opp" , 1)[0]
-							stopNameSimp = stopNameSimp.split("Adj" , 1)[0]
-							stopNameSimp = stopNameSimp.split("Stop" , 1)[0]
-							stopNameSimp = stopNameSimp.split("Adjacent" , 1)[0]
-							stopNameSimp = stopNameSimp.split("Opposite" , 1)[0]
-							stopNameSimp = stopNameSimp.split("N-Bound" , 1)[0]
-							stopNameSimp = stopNameSimp.split("Ne-Bound" , 1)[0]
-							stopNameSimp = stopNameSimp.split("Nw-Bound" , 1)[0]
-							stopNameSimp = stopNameSimp.split("S-Bound" , 1)[0]
-							stopNameSimp = stopNameSimp.split("Se-Bound" , 1)[0]
-							stopNameSimp = stopNameSimp.split("Sw-Bound" , 1)[0]
-							stopNameSimp = stopNameSimp.split("E-Bound" , 1)[0]
-							stopNameSimp = stopNameSimp.split("W-Bound" , 1)[0]
-
-							stopNameSimp = stopNameSimp.strip()	
-
-							StopNames.append(stopNameSimp + ", ")
-
-						# Got to the current stop.
-						if stop['location_code'] == Args.StopID:
-							found = True
-
-				except Exception as e:
-					print("Unable to parse XML data, is your API Key correct? : " + e)
+			response = Client.get("https://reading-opendata.r2p.com/api/v1/line-patterns?api_token=%s&line=%s" % (Args.APIKey, ServiceID), deadline=deadline)
+			# If HTTP failed.
+			if response.status != 200:
+				LinePatternBreaker.Failure()
+				return None
+			LinePatternBreaker.Success()
+
+			stops = json.loads(response.body)
+			try:
+				# Found the stop the service is currently at.
+				found = False
+		
+				for stop in stops:
+					#Add to the list all of the stops the service is yet to visit.
+					if found:
+						
+						# Removes any extra uneeded info from stop names to simplify them.
+						StopNames.append(NameSimplifier.Simplify(stop['location_code'], stop['location_name']) + ", ")
+
+					# Got to the current stop.
+					if stop['location_code'] == Args.StopID:
+						found = True
+
+			except Exception as e:
+				print("Unable to parse XML data, is your API Key correct? : " + e)
 			return StopNames
+		except DeadlineExceeded:
+			return None
 		except Exception as e:
 			print("GetData() ERROR")
 			print(str(e))
-			return []
+			LinePatternBreaker.Failure()
+			return None
+
+	# Starts getting the Via messages for the lines given which are not already known, in the background so the services can be shown
+	# straight away. Each is got at the same time as the others, up to 'ViaWorkers' at a time, rather than one after another.
+	@staticmethod
+	def WarmVias(lines):
+		if Args.ReducedAnimations:
+			return
+		deadline = Deadline(Args.RefreshDeadline)
+		with LiveTime.ViaLock:
+			lines = [line for line in dict.fromkeys(lines) if line not in Vias and line not in LiveTime.ViasPending]
+			LiveTime.ViasPending.update(lines)
+		for line in lines:
+			LiveTime.ViaPool.submit(LiveTime.WarmVia, line, deadline)
+
+	@staticmethod
+	def WarmVia(ServiceID, deadline):
+		try:
+			LiveTime.GetComplexVia(ServiceID, deadline)
+		finally:
+			with LiveTime.ViaLock:
+				LiveTime.ViasPending.discard(ServiceID)
 
 	# The "Via" message is not given by the API, this method generates the Via message and returns it.
-	def GetComplexVia(self, ServiceID):
+	@staticmethod
+	def GetComplexVia(ServiceID, deadline):
 		Via = ""
 		
 		if Args.ReducedAnimations:
@@ -199,9 +825,20 @@ class LiveTime(object):
 		if ServiceID in Vias:
 			return Vias[ServiceID]
 		
-		#Else this is the first time finding this service so look it up.
+		#Else this is the first time finding this service so look it up, from the stops remembered from before if there are any.
 		try:
-			ViasTemp = self.GetServiceLinePatteren(ServiceID)
+			ViasTemp = Patterns.Get(ServiceID)
+			if ViasTemp == None:
+				ViasTemp = LiveTime.GetServiceLinePatteren(ServiceID, deadline)
+				if ViasTemp != None:
+					Patterns.Put(ServiceID, ViasTemp)
+				else:
+					# If the stops could not be retrieved, use the ones remembered even if they are old.
+					ViasTemp = Patterns.Get(ServiceID, expired=True)
+
+			# If the stops could not be retrieved, don't remember it so it is looked up again next time.
+			if ViasTemp == None:
+				return ""
 			
 			# If it is the last stop in the route.
 			if len(ViasTemp) == 0:
@@ -239,51 +876,212 @@ class LiveTime(object):
 
 
 
-	# Returns true or false dependent upon if the last time an API data call was made was over the request limit; to prevent spamming the API feed.
+	# The fields of each MonitoredVehicleJourney used to make a LiveTime object, and where to find them.
+	FIELDS = {"LineRef": "{*}LineRef", "DestinationName": "{*}DestinationName", "AimedArrivalTime": "{*}MonitoredCall/{*}AimedArrivalTime",
+		"ExpectedArrivalTime": "{*}MonitoredCall/{*}ExpectedArrivalTime", "ID": "{*}FramedVehicleJourneyRef/{*}DatedVehicleJourneyRef"}
+
+	# Reads the services from a siri-sm response as it is parsed, returning the fields of each as a dictionary. Each service is thrown away once
+	# read so the whole parsed tree is never held in memory, and reading stops once 'limit' services have been found. The response itself
+	# has already been read in full by the HTTPClient, which needs all of it to decompress it and compare it with the last one.
+	# The Reading Buses API sometimes reports the same bus multiple times, only the first is kept.
+	@staticmethod
+	def ParseServices(source, limit):
+		services = []
+		seen = set()
+		for event, journey in etree.iterparse(source, events=("end",), tag="{*}MonitoredVehicleJourney"):
+			service = {field: journey.findtext(path, "") for field, path in LiveTime.FIELDS.items()}
+			visit = journey.getparent()
+			journey.clear()
+			while visit.getprevious() is not None:
+				del visit.getparent()[0]
+			# If not already recorded and not in the excluded services list add it.
+			if service["ID"] not in seen and service["LineRef"] not in Args.ExcludeServices:
+				seen.add(service["ID"])
+				services.append(service)
+				if len(services) >= limit:
+					break
+		return services
+
+	# Returns true or false dependent upon if the time picked for the next API data call has been reached; to prevent spamming the API feed.
 	@staticmethod
 	def TimePassed():
-		return (datetime.now() - LiveTime.LastUpdate).total_seconds() > Args.RequestLimit
+		return datetime.now() >= LiveTime.NextUpdate
+
+	# Picks when the next API call should be made based upon how soon the next service is due. Polls as often as the RequestLimit allows when a service
+	# is about to arrive, less often the further away the next service is and only every MaxRequestLimit when there are no services at all.
+	@staticmethod
+	def ScheduleNextUpdate(services):
+		interval = Args.RequestLimit
+		if not Args.FixedRequestLimit:
+			due = [seconds for seconds in (service.SecondsUntilArrival() for service in services) if seconds != None]
+			if len(due) == 0:
+				interval = Args.MaxRequestLimit
+			elif min(due) > LiveTime.SOON:
+				interval = min(due) / 3
+		LiveTime.NextUpdate = LiveTime.LastUpdate + timedelta(seconds=max(Args.RequestLimit, min(interval, Args.MaxRequestLimit)))
+
+	# Returns how many seconds until the service is predicted to arrive, or scheduled to if there is no prediction.
+	def SecondsUntilArrival(self):
+		return (self.ExptArrival if self.ExptArrival != None else self.SchArrival) - time.time()
 
 	# Return true or false dependent upon if the last time the display was updated was over the static update limit. This prevents updating the display to frequently to increase performance.
 	def TimePassedStatic(self):
-		return ("min" in self.DisplayTime) and (datetime.now() - self.LastStaticUpdate).total_seconds() > Args.StaticUpdateLimit 
+		return ("min" in self.DisplayTime) and time.time() - self.LastStaticUpdate > Args.StaticUpdateLimit 
+
+	# Updates the display times of the last services retrieved and returns them, used when the API returns the same data as last time.
+	@staticmethod
+	def RefreshLastServices():
+		for service in LiveTime.LastServices:
+			service.RefreshDisplayTime()
+		LiveTime.WarmVias([service.LineRef for service in LiveTime.LastServices[:ServiceList.AHEAD]])
+		LiveTime.ScheduleNextUpdate(LiveTime.LastServices)
+		return LiveTime.LastServices
+
+	# Used when new data can not be retrieved, keeps showing the last services retrieved with their times worked out again from when they were expected,
+	# leaving off any which have already left. Once the data is older than the 'StaleLimit' nothing is shown instead.
+	@staticmethod
+	def StaleServices():
+		if LiveTime.LastServices == None or (datetime.now() - LiveTime.LastGoodUpdate).total_seconds() > Args.StaleLimit:
+			return []
+		services = [service for service in LiveTime.LastServices if service.SecondsUntilArrival() == None or service.SecondsUntilArrival() > -LiveTime.DEPARTED]
+		for service in services:
+			service.RefreshDisplayTime()
+		print_safe("Unable to get new data, showing the data retrieved at %s" % LiveTime.LastGoodUpdate.time())
+		return services
 
 	# Calls the API and gets the data from it, returning a list of LiveTime objects to be used in the program.
 	# * Change this method to implement your own API *
 	@staticmethod
-	def GetData():
+	def GetData(deadline):
 		LiveTime.LastUpdate = datetime.now()
+		# Every request made as part of this refresh must finish by the deadline, given by the DataFetcher so it can stop it early.
+		LiveTime.CurrentDeadline = deadline
+		# If the request fails try again as soon as the RequestLimit allows.
+		LiveTime.NextUpdate = LiveTime.LastUpdate + timedelta(seconds=Args.RequestLimit)
 		services = []
 
-		try:
-			with urlopen("https://reading-opendata.r2p.com/api/v1/siri-sm?api_token=%s&location=%s" % (Args.APIKey, Args.StopID)) as conn:
-				raw = conn.read()
+		# Don't make a request while there is no network connection, new data is got as soon as it comes back.
+		if not Network.Online:
+			return LiveTime.StaleServices()
 
-				if conn.getcode() != 200:
-					return services
-				
-				try:
-					rawServices = objectify.fromstring(raw)
-				
-					# The Reading Buses API sometimes reports the same bus multiple times. To work around this we need to check if we have already found it.
-					for root in rawServices.ServiceDelivery.StopMonitoringDelivery.MonitoredStopVisit:
-						service = root.MonitoredVehicleJourney
-						exists = False
-						for current in services:
-							if current.ID == service.FramedVehicleJourneyRef.DatedVehicleJourneyRef:
-								exists = True
-								break
-						# If not already recorded and not in the excluded services list add it.
-						if exists == False and str(service.LineRef) not in Args.ExcludeServices:
-							# Convert the custom Reading Buses API object into a LiveTime object and add it to the list.
-							services.append(LiveTime(service, len(services)))
-				except Exception as e:
-					print("Unable to parse XML data, is your API Key correct? - " + e)
+		# Don't make a request if the API has been failing, until it is time to try it again.
+		if not FeedBreaker.Allow():
+			LiveTime.NextUpdate = max(LiveTime.NextUpdate, FeedBreaker.RetryAt)
+			return LiveTime.StaleServices()
+
+		try:
+			response = Client.get("https://reading-opendata.r2p.com/api/v1/siri-sm?api_token=%s&location=%s" % (Args.APIKey, Args.StopID), conditional=LiveTime.LastServices != None, deadline=LiveTime.CurrentDeadline)
+
+			# If the data is the same as last time, there is no need to read it again or rebuild the services; only update their times.
+			if response.unchanged:
+				FeedBreaker.Success()
+				LiveTime.LastGoodUpdate = datetime.now()
+				return LiveTime.RefreshLastServices()
+
+			if response.status != 200:
+				LiveTime.NextUpdate = max(LiveTime.NextUpdate, FeedBreaker.Failure())
+				return LiveTime.StaleServices()
+
+			try:
+				# Only as many services as can be shown before the next refresh are needed, one for each card and at least one for each row.
+				rawServices = LiveTime.ParseServices(io.BytesIO(response.body), max(3, Args.NumberOfCards + 1))
+
+				# Start getting the Via messages for the services shown first, so they arrive while the services are already being shown. The
+				# rest are got as the board gets closer to showing them, see ServiceList.
+				LiveTime.WarmVias([service["LineRef"] for service in rawServices[:ServiceList.AHEAD]])
+
+				for service in rawServices:
+					# Convert the custom Reading Buses API object into a LiveTime object and add it to the list.
+					services.append(LiveTime(service, len(services)))
+				LiveTime.LastServices = services
+				LiveTime.LastGoodUpdate = datetime.now()
+				LiveTime.ScheduleNextUpdate(services)
+				Client.commit(response)
+				FeedBreaker.Success()
+			except Exception as e:
+				print("Unable to parse XML data, is your API Key correct? - " + str(e))
+				LiveTime.NextUpdate = max(LiveTime.NextUpdate, FeedBreaker.Failure())
+				return LiveTime.StaleServices()
 			return services
+		except DeadlineExceeded:
+			# The refresh ran out of time or was stopped, such as when the network connection was lost; this says nothing about whether
+			# the API is working, so it is not counted as a failure.
+			print_safe("Ran out of time getting new data %s" % datetime.now().time())
+			return LiveTime.StaleServices()
 		except Exception as e:
 			print("GetData() ERROR")
 			print(str(e))
-			return []
+			LiveTime.NextUpdate = max(LiveTime.NextUpdate, FeedBreaker.Failure())
+			return LiveTime.StaleServices()
+
+
+###
+## Service List
+## The services handed to the board. Each service is only worked out, and has its Via message got, once the board is about to show it.
+###
+class ServiceList(tuple):
+	# How many services ahead of the one being shown to start getting the Via messages for; one for each row.
+	AHEAD = 3
+
+	def __getitem__(self, index):
+		service = tuple.__getitem__(self, index)
+		# Start getting the Via messages for the services coming up next, so they have arrived by the time they are shown.
+		index = index % len(self)
+		LiveTime.WarmVias([upcoming.LineRef for upcoming in tuple.__getitem__(self, slice(index + 1, index + 1 + ServiceList.AHEAD))])
+		return service.Materialise()
+
+
+###
+## Data Fetcher
+## Gets new data from the API on a background thread, so the display can keep animating while it waits on the network.
+###
+class DataFetcher():
+	# How many cards before the end of a cycle to start getting new data, so it is ready for when the cycle wraps round.
+	PREFETCH_CARDS = 3
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.snapshot = None
+		self.worker = None
+		# The deadline of the fetch in progress.
+		self.deadline = None
+
+	# Starts getting new data in the background, unless a request is already in progress.
+	def prefetch(self):
+		if self.is_fetching():
+			return
+		# Each fetch is given its own deadline before it starts, so cancelling always stops the fetch in progress rather than the one before.
+		self.deadline = Deadline(Args.RefreshDeadline)
+		self.worker = threading.Thread(target=self.run, args=(self.deadline,), daemon=True)
+		self.worker.start()
+
+	# Stops the fetch in progress early, if there is one; it then returns whatever it has got so far.
+	def cancel(self):
+		if self.is_fetching():
+			self.deadline.Cancel()
+
+	def is_fetching(self):
+		return self.worker != None and self.worker.is_alive()
+
+	def run(self, deadline):
+		self.publish(LiveTime.GetData(deadline))
+
+	# Stores a completed list of services, it is kept as a tuple so it can not be changed once handed over to the board.
+	def publish(self, services):
+		with self.lock:
+			self.snapshot = ServiceList(services)
+
+	# Returns true or false dependent upon if there is new data which has not yet been shown.
+	def has_new(self):
+		with self.lock:
+			return self.snapshot != None
+
+	# Returns the newest list of services which has not yet been shown, or None if there is nothing new.
+	def take(self):
+		with self.lock:
+			services = self.snapshot
+			self.snapshot = None
+		return services
 
 
 ###
@@ -434,24 +1232,54 @@ class ScrollTime():
 
 	# Generates all the Images (Text boxes) to be drawn on the display.
 	def generateCard(self,service):
+		# What the card was made with, so it is only made again when some of it changes.
+		self.CardText = self.getCardText(service)
 		displayTimeTemp = TextImage(device, service.DisplayTime)
-		IDestinationTemp  = TextImageComplex(device, service.Destination,service.Via, displayTimeTemp.width)
 
-		self.IDestination =  ComposableImage(IDestinationTemp.image.crop((0,0,IDestinationTemp.width + 10,16)), position=(45 if Args.ShowIndex else 30, 16 * self.position))
-		self.IServiceNumber =  ComposableImage(TextImage(device, service.ServiceNumber).image.crop((0,0,45 if Args.ShowIndex else 30,16)), position=(0, 16 * self.position))
+		# Reuse the images made the last time the service was shown, unless what is on them has changed since.
+		ImageText = (service.ServiceNumber, service.Destination, service.Via, displayTimeTemp.width)
+		images = self.Controller.CardImages.get(service.ID)
+		if images == None or images[0] != ImageText:
+			IDestinationTemp  = TextImageComplex(device, service.Destination,service.Via, displayTimeTemp.width)
+			images = (ImageText, IDestinationTemp.image.crop((0,0,IDestinationTemp.width + 10,16)), TextImage(device, service.ServiceNumber).image.crop((0,0,45 if Args.ShowIndex else 30,16)))
+			self.Controller.CardImages[service.ID] = images
+
+		self.IDestination =  ComposableImage(images[1], position=(45 if Args.ShowIndex else 30, 16 * self.position))
+		self.IServiceNumber =  ComposableImage(images[2], position=(0, 16 * self.position))
 		self.IDisplayTime =  ComposableImage(displayTimeTemp.image, position=(device.width - displayTimeTemp.width, 16 * self.position))
 
+	# Returns what is shown on the card for a service, so it can be told when the card needs making again.
+	def getCardText(self, service):
+		return (service.DisplayTime, service.ServiceNumber, service.Destination, service.Via)
+
 	# Called when you have new/updated information from an API call and want to update the objects predicted arrival time.
 	def updateCard(self, newService, device):
 		self.state = self.SCROLL_DECIDER
 		self.synchroniser.ready(self)
-		self.image_composition.remove_image(self.IDisplayTime)
+		self.retimeCard(newService)
 
-		displayTimeTemp = TextImage(device, newService.DisplayTime)
-		self.IDisplayTime = ComposableImage(displayTimeTemp.image, position=(device.width - displayTimeTemp.width, 16 * self.position))
-	
-		self.image_composition.add_image(self.IDisplayTime)
-		self.image_composition.refresh()
+	# Gives the row new data for the service it is already showing. The card is only made again if what is shown on it has changed, and
+	# where it has scrolled to is kept; so new data does not start the card again.
+	def retimeCard(self, newService):
+		self.CurrentService = newService
+		if self.getCardText(newService) == self.CardText:
+			return
+
+		# The images for the card are only on the display once it has finished opening.
+		showing = self.is_showing()
+		if showing:
+			self.image_composition.remove_image(self.IDestination)
+			self.image_composition.remove_image(self.IServiceNumber)
+			self.image_composition.remove_image(self.IDisplayTime)
+		offset = self.IDestination.offset
+		self.generateCard(newService)
+		self.IDestination.offset = offset
+		self.max_pos = self.IDestination.width
+		if showing:
+			self.image_composition.add_image(self.IDestination)
+			self.image_composition.add_image(self.IServiceNumber)
+			self.image_composition.add_image(self.IDisplayTime)
+			self.image_composition.refresh()
 
 	# Called when you want to change the row from one service to another.
 	def changeCard(self, newService, device):
@@ -502,13 +1330,9 @@ class ScrollTime():
 	# Called upon each time you want to get the next frame for the display.
 	def tick(self):
 		#Update X min till arrival.
-		if self.CurrentService.TimePassedStatic() and (self.state == self.SCROLL_DECIDER or self.state == self.SCROLLING_WAIT or self.state == self.SCROLLING or self.state == self.WAIT_SYNC):
-			self.image_composition.remove_image(self.IDisplayTime)
+		if self.CurrentService.TimePassedStatic() and self.is_showing():
 			self.CurrentService.DisplayTime = self.CurrentService.GetDisplayTime()
-			displayTimeTemp = TextImage(device, self.CurrentService.DisplayTime)
-			self.IDisplayTime = ComposableImage(displayTimeTemp.image, position=(device.width - displayTimeTemp.width, 16 * self.position))           
-			self.image_composition.add_image(self.IDisplayTime)
-			self.image_composition.refresh()
+			self.retimeCard(self.CurrentService)
 
 
 		if self.state == self.WAIT_OPENING:
@@ -540,8 +1364,10 @@ class ScrollTime():
 				if not self.is_waiting():
 					if self.synchroniser.is_synchronised():
 						self.synchroniser.busy(self)
-						# If not a valid via message or not wanting animations.
-						if self.CurrentService.Via == "" or Args.ReducedAnimations:
+						# The Via message may have arrived since the card was made, so make it again with it before deciding to scroll.
+						self.retimeCard(self.CurrentService)
+						# If not a valid via message on the card or not wanting animations.
+						if self.CardText[3] == "" or Args.ReducedAnimations:
 							self.state = self.WAIT_SYNC
 						elif self.CurrentService.ID == "0":
 							self.synchroniser.ready(self)
@@ -616,6 +1442,10 @@ class ScrollTime():
 	def addPartner(self, partner):
 		self.partner = partner
 
+	# Returns true or false dependent upon if the card's images are on the display, they are from when it finishes opening until it is changed.
+	def is_showing(self):
+		return self.state == self.SCROLL_DECIDER or self.state == self.SCROLLING_WAIT or self.state == self.SCROLLING or self.state == self.WAIT_SYNC
+
 	# Used to add a time delay between animations.
 	def is_waiting(self):
 		self.ticks += 1
@@ -630,14 +1460,22 @@ class ScrollTime():
 ###
 class boardFixed():
 	def __init__(self, image_composition, scroll_delay, device):
-		self.Services = LiveTime.GetData()   
+		# The board is made from the data already got in the background, if there is any, so the display never waits on the network. If
+		# there is none yet it shows that there are no services while new data is got, and is made again once it arrives; see is_waiting.
+		self.Services = Fetcher.take() or ()
+		if LiveTime.TimePassed():
+			Fetcher.prefetch()
 		self.synchroniser = Synchroniser()
 		self.scroll_delay = scroll_delay
 		self.image_composition = image_composition
 		self.device = device
 		self.ticks = 0
+		# The images made for each service shown, so they can be used again the next time it is shown; see ScrollTime.generateCard.
+		self.CardImages = {}
 		self.setInitalCards()
 		self.State = "alive"
+		# True while waiting on new data got after the network connection came back, to be shown as soon as it arrives.
+		self.Refreshing = False
 	
 		NoServiceTemp = NoService(device)
 		self.NoServices = ComposableImage(NoServiceTemp.image, position=(int(device.width/2- NoServiceTemp.width/2),int(device.height/2-NoServiceTemp.height/2)))
@@ -680,10 +1518,29 @@ class boardFixed():
 		# If it has cycled through all cards, cycle from start again, unless enough time has passed for a new API request.
 		if (self.x > Args.NumberOfCards or self.x >len(self.Services)-1):
 			self.x = 1 if Args.FixToArrive else 0
-			if LiveTime.TimePassed():  
-				self.Services = LiveTime.GetData()
-				print_safe("New Data Retrieved %s" % datetime.now().time())
-		
+			# Swap in the new data retrieved in the background, if there is any.
+			NewServices = Fetcher.take()
+			if NewServices != None:
+				Changes = self.updateServices(NewServices, False)
+				self.Refreshing = False
+				print_safe("New Data Retrieved %s - %s - %s" % (datetime.now().time(), Changes, Client.stats()))
+
+		# Once the network connection comes back start getting new data straight away, and show it as soon as it arrives rather than at the end of the cycle.
+		if Network.Refresh and LiveTime.TimePassed():
+			Network.Refresh = False
+			self.Refreshing = True
+			Fetcher.prefetch()
+		elif self.Refreshing:
+			NewServices = Fetcher.take()
+			if NewServices != None:
+				Changes = self.updateServices(NewServices, True)
+				self.Refreshing = False
+				print_safe("New Data Retrieved %s - %s" % (datetime.now().time(), Changes))
+
+		# Start getting new data shortly before the end of the cycle, so it is ready for when the cycle wraps round.
+		if LiveTime.TimePassed() and self.x >= min(Args.NumberOfCards, len(self.Services)-1) - DataFetcher.PREFETCH_CARDS:
+			Fetcher.prefetch()
+
 		# If there are more rows (3) than there is services scheduled show nothing.
 		if row > len(self.Services):       
 			card.changeCard(LiveTimeStud(),device)
@@ -710,10 +1567,42 @@ class boardFixed():
 		if  not (Args.FixToArrive and row == 1):
 			self.x = self.x + 1
 
-	# Used to add a time delay if there was an error with the last API request (providing a back off and wait mechanism)
+	# Swaps in new data for the board, working out what has changed since the last data rather than starting again. Rows showing a service
+	# which is still coming are given its new data straight away, only making the card again if what is shown on it has changed; the images
+	# kept for services which have gone are thrown away; and if 'keepPlace' the cycle carries on from the service which was going to be
+	# shown next, wherever it now is. Returns a summary of what changed.
+	def updateServices(self, NewServices, keepPlace):
+		OldIDs = [service.ID for service in self.Services]
+		OldTimes = {service.ID: service.ExptArrival for service in self.Services}
+		NewIDs = {}
+		NewTimes = {}
+		for index, service in enumerate(NewServices):
+			NewIDs.setdefault(service.ID, index)
+			NewTimes.setdefault(service.ID, service.ExptArrival)
+
+		if keepPlace and len(OldIDs) > 0 and OldIDs[self.x % len(OldIDs)] in NewIDs:
+			self.x = max(1 if Args.FixToArrive else 0, NewIDs[OldIDs[self.x % len(OldIDs)]])
+
+		for row in (self.top, self.middel, self.bottom):
+			if row.CurrentService.ID in NewIDs:
+				row.retimeCard(NewServices[NewIDs[row.CurrentService.ID]])
+
+		self.CardImages = {ID: images for ID, images in self.CardImages.items() if ID in NewIDs}
+		self.Services = NewServices
+
+		kept = [ID for ID in dict.fromkeys(OldIDs) if ID in NewIDs]
+		retimed = len([ID for ID in kept if OldTimes[ID] != NewTimes[ID]])
+		reordered = kept != sorted(kept, key=NewIDs.get)
+		return "%d added, %d removed, %d re-timed%s" % (len(NewIDs) - len(kept), len(set(OldIDs)) - len(kept), retimed, ", reordered" if reordered else "")
+
+	# Used to add a time delay if there was an error with the last API request or there were no services, until the time picked for the next
+	# API data call; which backs off after failures in a row (providing a back off and wait mechanism). The new data is got in the background
+	# so the display keeps running, and the wait is over once it has been got.
 	def is_waiting(self):
 		self.ticks += 1
-		if self.ticks > Args.RecoveryTime:
+		if LiveTime.TimePassed():
+			Fetcher.prefetch()
+		if Fetcher.has_new():
 			self.ticks = 0
 			return False
 		return True
@@ -745,6 +1634,9 @@ if Args.Display == 'gifanim':
 	device._max_frames = int(Args.maxframes)
 
 image_composition = ImageComposition(device)
+Fetcher = DataFetcher()
+if not Args.IgnoreNetwork:
+	Network.start()
 board = boardFixed(image_composition,Args.Delay,device)
 FontTime = ImageFont.truetype("%s/resources/time.otf" % (os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))),16)
 device.contrast(255)